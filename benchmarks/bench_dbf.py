@@ -0,0 +1,67 @@
+"""对比内存映射 DBF 读取器与 OGR（pyogrio/Arrow）读取 Shapefile 属性表的耗时
+
+默认生成 50 万条记录的 Shapefile（synthetic.py 的 mixed 结构：中文字符串、数值、日期、布尔与空值），
+只读取属性（不读几何），统计各引擎读完全部批次的耗时和吞吐量。
+
+用法：python benchmarks/bench_dbf.py --rows 500000 [--keep 目录]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import layer_path, make_layer  # noqa: E402
+from export2xlsx.reader import _iter_attribute_batches  # noqa: E402
+
+
+def consume(path, engine, batch_size):
+    """读完全部批次，返回 (耗时, 行数)"""
+    start = time.perf_counter()
+    rows = 0
+    for batch in _iter_attribute_batches(path, None, None, batch_size, engine):
+        rows += len(batch)
+    return time.perf_counter() - start, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--keep", help="生成的 Shapefile 保存目录（默认使用临时目录）")
+    args = parser.parse_args()
+
+    workdir = args.keep or tempfile.mkdtemp()
+    results = {}
+    try:
+        path = layer_path(workdir, "shp", "mixed", args.rows)
+        if not os.path.exists(path):
+            print(f"正在生成 {args.rows} 条记录的 Shapefile: {path}")
+        path = make_layer(workdir, "shp", "mixed", args.rows)
+
+        for engine in ("dbf", "arrow", "pyogrio"):
+            try:
+                elapsed, rows = consume(path, engine, args.batch_size)
+            except Exception as e:
+                print(f"{engine:>8}: 跳过（{e}）")
+                continue
+            results[engine] = elapsed
+            print(f"{engine:>8}: {elapsed:8.2f} s  {rows / elapsed:12,.0f} 行/秒")
+    finally:
+        # 临时目录用完即删（Windows 上 DBF 的内存映射可能尚未释放，删除失败时忽略）
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if "dbf" in results:
+        for engine in ("arrow", "pyogrio"):
+            if engine in results:
+                print(f"dbf 相对 {engine} 加速比: {results[engine] / results['dbf']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""可复现的基准测试套件：合成大图层的读取与导出吞吐量、峰值内存、输出大小
+
+在本地生成 10 万/100 万等规模的 Shapefile、GeoPackage、GeoJSON 合成图层（见 synthetic.py），
+对每个 格式 × 结构 × 行数 × 引擎 分别测量：
+  read    只读取全部属性批次（_iter_attribute_batches）
+  export  完整导出为 XLSX 或 --output-format 指定的格式（export_layer）
+每个用例在独立子进程中运行，峰值内存互不影响。结果打印为表格，可用 --json 保存以便比较多次运行。
+
+用法：
+  python benchmarks/bench_suite.py                          # 默认 10k/100k 行，全部格式
+  python benchmarks/bench_suite.py --rows 1000000 --formats shp --tasks export
+  python benchmarks/bench_suite.py --json before.json       # 保存结果
+  python benchmarks/bench_suite.py --tasks export --style fast   # 比较导出样式的耗时与输出大小
+  python benchmarks/bench_suite.py --tasks export --output-format csv   # 比较输出后端
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import FORMATS, SCHEMAS, make_layer  # noqa: E402
+from export2xlsx.backends import OUTPUT_FORMATS  # noqa: E402
+
+# 各格式可用的读取引擎（dbf 只适用于 Shapefile）
+ENGINES = {
+    "shp": ("dbf", "arrow", "pyogrio", "fiona"),
+    "gpkg": ("arrow", "pyogrio", "fiona"),
+    "geojson": ("arrow", "pyogrio", "fiona"),
+}
+TASKS = ("read", "export")
+
+
+def run_case(case):
+    """在当前进程中运行一个用例，返回结果字典（由子进程调用；计时不含模块导入）"""
+    from export2xlsx.core import export_layer
+    from export2xlsx.perf import memory_usage
+    from export2xlsx.reader import READ_BATCH_SIZE, _iter_attribute_batches
+
+    start = time.perf_counter()
+    rows = output_bytes = None
+    if case["task"] == "read":
+        rows = 0
+        batches = _iter_attribute_batches(case["path"], None, None, case["batch_size"] or READ_BATCH_SIZE, case["engine"])
+        for batch in batches:
+            rows += len(batch)
+    else:
+        output = os.path.join(case["output_dir"], os.path.basename(case["path"])
+                              + f".{case['engine']}{OUTPUT_FORMATS[case['output_format']]}")
+        paths = export_layer(case["path"], output, engine=case["engine"], batch_size=case["batch_size"],
+                             memory_budget=case["memory_mb"] * 1024 * 1024, style=case["style"],
+                             output_format=case["output_format"])
+        output_bytes = sum(os.path.getsize(path) for path in paths)
+        for path in paths:
+            os.remove(path)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "rows_read": rows,
+        "peak_rss_mb": round((memory_usage()[1] or 0) / 1048576, 1),
+        "output_mb": round(output_bytes / 1048576, 2) if output_bytes is not None else None,
+    }
+
+
+def spawn_case(case):
+    """在子进程中运行用例，失败时返回包含 error 的结果"""
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)],
+                          capture_output=True, text=True, encoding="utf-8")
+    if proc.returncode != 0:
+        lines = (proc.stderr or proc.stdout).strip().splitlines()
+        return {"error": lines[-1] if lines else f"退出码 {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _split(text, choices=None, cast=str):
+    """解析逗号分隔的参数"""
+    values = [cast(value.strip()) for value in text.split(",") if value.strip()]
+    if choices:
+        unknown = [value for value in values if value not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"未知取值：{', '.join(map(str, unknown))}")
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10000,100000", help="行数，逗号分隔（如 10000,100000,1000000）")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="格式：shp,gpkg,geojson")
+    parser.add_argument("--schemas", default=",".join(SCHEMAS), help="属性表结构：mixed,wide")
+    parser.add_argument("--engines", help="只测这些引擎（默认每种格式的全部可用引擎）")
+    parser.add_argument("--tasks", default=",".join(TASKS), help="测量项：read,export")
+    parser.add_argument("--batch-size", type=int, help="每批读取行数（默认 read 为 10000，export 按内存预算自动选择）")
+    parser.add_argument("--memory-mb", type=int, default=64, help="export 的每批内存预算（MB）")
+    parser.add_argument("--style", default="styled", choices=("fast", "balanced", "styled"), help="export 的导出样式")
+    parser.add_argument("--output-format", default="xlsx", choices=tuple(OUTPUT_FORMATS), help="export 的输出格式")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "export2xlsx_bench"),
+                        help="合成图层的保存目录（已生成的图层会复用）")
+    parser.add_argument("--json", help="将结果保存为 JSON 文件")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return
+
+    rows_list = _split(args.rows, cast=int)
+    formats = _split(args.formats, FORMATS)
+    schemas = _split(args.schemas, SCHEMAS)
+    tasks = _split(args.tasks, TASKS)
+    engines = _split(args.engines) if args.engines else None
+    output_dir = tempfile.mkdtemp()
+    try:
+        results = run_cases(args, rows_list, formats, schemas, tasks, engines, output_dir)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存：{args.json}")
+
+
+def run_cases(args, rows_list, formats, schemas, tasks, engines, output_dir):
+    """逐个运行 格式 × 结构 × 行数 × 测量 × 引擎 的用例并打印结果行，返回结果列表"""
+    results = []
+    header = f"{'格式':<8}{'结构':<7}{'行数':>9}  {'测量':<7}{'引擎':<8}{'耗时(s)':>9}{'行/秒':>11}{'峰值MB':>9}{'输出MB':>9}"
+    print(header)
+    for fmt in formats:
+        for schema in schemas:
+            for rows in rows_list:
+                path = make_layer(args.data_dir, fmt, schema, rows)
+                for task in tasks:
+                    for engine in ENGINES[fmt]:
+                        if engines and engine not in engines:
+                            continue
+                        case = {"path": path, "task": task, "engine": engine, "batch_size": args.batch_size,
+                                "memory_mb": args.memory_mb, "style": args.style,
+                                "output_format": args.output_format, "output_dir": output_dir}
+                        result = spawn_case(case)
+                        result.update(format=fmt, schema=schema, rows=rows, task=task, engine=engine,
+                                      batch_size=args.batch_size,
+                                      memory_mb=args.memory_mb if task == "export" else None,
+                                      style=args.style if task == "export" else None,
+                                      output_format=args.output_format if task == "export" else None)
+                        results.append(result)
+                        prefix = f"{fmt:<10}{schema:<9}{rows:>10}  {task:<9}{engine:<10}"
+                        if "error" in result:
+                            print(f"{prefix}失败：{result['error']}")
+                            continue
+                        output_mb = f"{result['output_mb']:9.2f}" if result["output_mb"] is not None else f"{'-':>9}"
+                        print(f"{prefix}{result['seconds']:9.2f}{rows / result['seconds']:13,.0f}"
+                              f"{result['peak_rss_mb']:10.0f}{output_mb}", flush=True)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""生成基准测试用的合成图层（Shapefile / GeoPackage / GeoJSON）
+
+属性表包含整数、浮点、日期、布尔、短中文字符串与长中文文本，数值、日期与字符串列约有 10% 空值；
+wide 结构在此基础上再加 60 个数值/字符串列。同样的参数总是生成同样的数据（固定随机种子）。
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+FORMATS = {
+    "shp": ("ESRI Shapefile", ".shp"),
+    "gpkg": ("GPKG", ".gpkg"),
+    "geojson": ("GeoJSON", ".geojson"),
+}
+SCHEMAS = ("mixed", "wide")
+
+# 长文本的字符数；GBK 下每个汉字 2 字节，须小于 Shapefile 字符字段的 254 字节上限
+LONG_TEXT_CHARS = 100
+NULL_RATIO = 0.1
+WIDE_EXTRA_COLUMNS = 60
+
+
+def _with_nulls(values, rng):
+    """按 NULL_RATIO 随机置空（返回 object 数组）"""
+    values = np.asarray(values, dtype=object)
+    values[rng.random(len(values)) < NULL_RATIO] = None
+    return values
+
+
+def _cjk_pool(rng, size, length):
+    """生成 size 个长度为 length 的随机汉字字符串（CJK 基本区，GBK 均可编码）"""
+    codes = rng.integers(0x4E00, 0x9FA6, (size, length))
+    return np.array(["".join(map(chr, row)) for row in codes], dtype=object)
+
+
+def make_frame(rows, schema="mixed", seed=0, extra_columns=None):
+    """生成属性表 DataFrame（不含几何）；extra_columns 为 wide 结构追加的列数（默认 WIDE_EXTRA_COLUMNS）"""
+    rng = np.random.default_rng(seed)
+    districts = np.array(["城关区", "七里河区", "西固区", "安宁区", "红古区", "榆中县", "皋兰县", "永登县"], dtype=object)
+    long_texts = _cjk_pool(rng, 1000, LONG_TEXT_CHARS)
+
+    area = rng.random(rows) * 1e4
+    area[rng.random(rows) < NULL_RATIO] = np.nan
+    dates = pd.Timestamp("2000-01-01") + pd.to_timedelta(rng.integers(0, 9000, rows), unit="D")
+    dates = dates.where(rng.random(rows) >= NULL_RATIO)
+
+    data = {
+        "编号": np.arange(rows, dtype="int64"),
+        "名称": _with_nulls([f"地块{i}号" for i in range(rows)], rng),
+        "行政区": _with_nulls(districts[rng.integers(0, len(districts), rows)], rng),
+        "面积": area,
+        "人口": rng.integers(0, 100_000, rows),
+        "登记日期": dates.date,
+        "已核查": rng.random(rows) < 0.5,
+        "备注": _with_nulls(long_texts[rng.integers(0, len(long_texts), rows)], rng),
+    }
+    if schema == "wide":
+        for i in range(WIDE_EXTRA_COLUMNS if extra_columns is None else extra_columns):
+            if i % 2:
+                data[f"T{i:03d}"] = _with_nulls(districts[rng.integers(0, len(districts), rows)], rng)
+            else:
+                data[f"N{i:03d}"] = rng.random(rows) * 1000
+    df = pd.DataFrame(data)
+    df["登记日期"] = df["登记日期"].where(df["登记日期"].notna(), None)
+    return df
+
+
+def layer_path(data_dir, fmt, schema, rows):
+    """合成图层的文件路径"""
+    return os.path.join(data_dir, f"{schema}_{rows}{FORMATS[fmt][1]}")
+
+
+def make_layer(data_dir, fmt, schema, rows, seed=0):
+    """生成合成图层（已存在时直接返回路径）"""
+    path = layer_path(data_dir, fmt, schema, rows)
+    if os.path.exists(path):
+        return path
+
+    import geopandas as gpd
+
+    os.makedirs(data_dir, exist_ok=True)
+    rng = np.random.default_rng(seed + 1)
+    gdf = gpd.GeoDataFrame(
+        make_frame(rows, schema, seed),
+        geometry=gpd.points_from_xy(103.5 + rng.random(rows), 36 + rng.random(rows)),
+        crs="EPSG:4326",
+    )
+    driver = FORMATS[fmt][0]
+    options = {"encoding": "gbk"} if fmt == "shp" else {}
+    # 先写临时文件再改名，避免中断后留下不完整的图层被当作已生成；
+    # 图层名按最终文件名指定，否则 GeoPackage 中的图层会叫 <name>_tmp
+    root, ext = os.path.splitext(path)
+    gdf.to_file(root + "_tmp" + ext, layer=os.path.basename(root), driver=driver, engine="pyogrio", **options)
+    # Shapefile 的 .shp 最后改名，作为生成完成的标志
+    for sidecar in (".shx", ".dbf", ".prj", ".cpg", ext):
+        if os.path.exists(root + "_tmp" + sidecar):
+            os.replace(root + "_tmp" + sidecar, root + sidecar)
+    return path
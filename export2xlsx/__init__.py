@@ -0,0 +1,31 @@
+"""GIS图层属性表导出为 XLSX 的工具包
+
+核心导出功能不依赖 Tk，可在无界面的服务器上通过函数或命令行调用：
+
+    from export2xlsx import export_layer
+    export_layer("parcels.shp", "parcels.xlsx", fields=["名称", "面积"])
+
+图形界面位于 export2xlsx.gui（export_to_xlsx() 启动）。
+"""
+
+from .batch import BatchResult, export_batch, format_batch_summary, plan_batch
+from .cache import ExportCache
+from .core import ExportCancelled, export_layer
+from .perf import ExportProfile
+from .schema import FieldInfo, LayerSchema, read_schema
+from .writer import XlsxStreamWriter
+
+__all__ = [
+    "BatchResult",
+    "ExportCache",
+    "ExportCancelled",
+    "ExportProfile",
+    "FieldInfo",
+    "LayerSchema",
+    "XlsxStreamWriter",
+    "export_batch",
+    "export_layer",
+    "format_batch_summary",
+    "plan_batch",
+    "read_schema",
+]
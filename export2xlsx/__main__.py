@@ -0,0 +1,11 @@
+"""python -m export2xlsx 入口"""
+
+import multiprocessing
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    # 打包为 exe 后进程池的子进程需要此调用
+    multiprocessing.freeze_support()
+    sys.exit(main())
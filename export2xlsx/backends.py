@@ -0,0 +1,335 @@
+"""输出后端：XLSX（默认）、CSV、Parquet，以及实验性的多进程 XLSX 写入
+
+每个后端都是一个流式写入器，接口与 writer.XlsxStreamWriter 相同：
+    write_batch(df) 逐批写入，close() 返回全部输出文件路径；
+    rows_written、output_paths 与 on_file_closed(路径, 行数) 供导出流程与断点续传使用。
+由 open_writer 按 output_format 创建，未指定时按输出文件扩展名选择。
+"""
+
+import collections
+import concurrent.futures
+import csv
+import os
+import shutil
+
+import pandas as pd
+import xlsxwriter
+
+from .perf import null_phase
+from .writer import (DEFAULT_STYLE, ColumnWidths, XlsxStreamWriter, _convert_columns, _plan_columns,
+                     _split_file_path, _write_columns, add_formats)
+
+# 输出格式 -> 文件扩展名
+OUTPUT_FORMATS = collections.OrderedDict([
+    ('xlsx', '.xlsx'),
+    ('csv', '.csv'),
+    ('parquet', '.parquet'),
+    ('xlsx-parallel', '.xlsx'),
+])
+
+# 多进程 XLSX 写入：每个任务生成的行数，以及同时在进程池中排队的任务数（每个写入进程）
+PARALLEL_PART_ROWS = 20000
+_PARALLEL_QUEUE_PER_WORKER = 2
+
+
+def output_format_for(path):
+    """按输出文件扩展名选择输出格式（.csv / .parquet，其余为 xlsx）"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return 'csv'
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    return 'xlsx'
+
+
+def open_writer(output_format, output_path, sheet_name, fields, headers=None, style=DEFAULT_STYLE, **options):
+    """创建 output_format 对应的流式写入器；options 为 max_rows_per_file、max_bytes_per_file、
+    profile、first_file_index、on_file_closed（CSV 与 Parquet 不使用 sheet_name 与 style）"""
+    output_format = output_format or output_format_for(output_path)
+    if output_format == 'xlsx':
+        return XlsxStreamWriter(output_path, sheet_name, fields, headers, style=style, **options)
+    if output_format == 'xlsx-parallel':
+        return ParallelXlsxWriter(output_path, sheet_name, fields, headers, style=style, **options)
+    if output_format == 'csv':
+        return CsvStreamWriter(output_path, fields, headers, **options)
+    if output_format == 'parquet':
+        return ParquetStreamWriter(output_path, fields, headers, **options)
+    raise Exception(f"未知的输出格式：{output_format}（可选 {', '.join(OUTPUT_FORMATS)}）")
+
+
+class SplitFileWriter:
+    """按行数或字节预算拆分为多个文件的流式写入器基类（CSV、Parquet）
+
+    达到 max_rows_per_file / max_bytes_per_file 时续写到 name_2.ext、name_3.ext ...
+    子类实现 _open_file、_write_part、_file_bytes 与 _close_file。
+    """
+
+    def __init__(self, output_path, fields, headers=None, max_rows_per_file=None, max_bytes_per_file=None,
+                 profile=None, first_file_index=1, on_file_closed=None):
+        self.output_path = output_path
+        self.fields = list(fields)
+        self.headers = [str(header) for header in (headers or self.fields)]
+        self.max_rows_per_file = max_rows_per_file
+        self.max_bytes_per_file = max_bytes_per_file
+        self.rows_written = 0
+        self.output_paths = []
+        self.first_file_index = first_file_index
+        self.on_file_closed = on_file_closed
+        self._phase = profile.phase if profile is not None else null_phase
+        self._open()
+
+    def _open(self):
+        path = _split_file_path(self.output_path, self.first_file_index + len(self.output_paths))
+        self.output_paths.append(path)
+        self._file_rows = 0
+        self._open_file(path)
+
+    def _file_full(self):
+        """当前文件是否已达到行数或字节预算"""
+        if not self._file_rows:
+            return False
+        if self.max_rows_per_file and self._file_rows >= self.max_rows_per_file:
+            return True
+        if self.max_bytes_per_file and self._file_bytes() >= self.max_bytes_per_file:
+            return True
+        return False
+
+    def write_batch(self, df):
+        """写入一批数据，必要时在批内切换到下一个文件"""
+        start = 0
+        while start < len(df):
+            if self._file_full():
+                self._close()
+                self._open()
+            space = len(df) - start
+            if self.max_rows_per_file:
+                space = min(space, self.max_rows_per_file - self._file_rows)
+            part = df.iloc[start:start + space]
+            self._write_part(part)
+            self._file_rows += len(part)
+            self.rows_written += len(part)
+            start += len(part)
+
+    def _close(self):
+        with self._phase('close'):
+            self._close_file()
+        if self.on_file_closed is not None:
+            self.on_file_closed(self.output_paths[-1], self._file_rows)
+
+    def close(self):
+        """关闭当前文件，返回全部输出文件路径"""
+        self._close()
+        return self.output_paths
+
+
+class CsvStreamWriter(SplitFileWriter):
+    """CSV 写入：UTF-8 带 BOM（Excel 直接双击打开时中文不乱码），CRLF 换行，空值为空字段"""
+
+    def _open_file(self, path):
+        self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        csv.writer(self._file, lineterminator='\r\n').writerow(self.headers)
+
+    def _write_part(self, part):
+        with self._phase('convert', len(part)):
+            text = part.to_csv(None, columns=self.fields, header=False, index=False, lineterminator='\r\n')
+        with self._phase('write', len(part)):
+            self._file.write(text)
+
+    def _file_bytes(self):
+        return self._file.tell()
+
+    def _close_file(self):
+        self._file.close()
+
+
+class ParquetStreamWriter(SplitFileWriter):
+    """Parquet 写入（需要 pyarrow）：每批写为一个行组，列名为导出的列标题
+
+    各列类型取自第一批数据；第一批中全为空的列按文本处理。
+    """
+
+    def __init__(self, output_path, fields, headers=None, **options):
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise Exception("导出 Parquet 需要安装 pyarrow")
+        self._schema = None
+        super().__init__(output_path, fields, headers, **options)
+
+    def _open_file(self, path):
+        self._path = path
+        self._writer = None
+
+    def _first_schema(self, df):
+        """由第一批数据确定各列类型：全空列改为文本，分类列统一为 int32 编码的字典类型"""
+        import pyarrow as pa
+
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        fields = []
+        for field in schema:
+            if pa.types.is_null(field.type):
+                field = field.with_type(pa.string())
+            elif pa.types.is_dictionary(field.type):
+                field = field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+            fields.append(field)
+        return pa.schema(fields, metadata=schema.metadata)
+
+    def _to_table(self, part):
+        """一段数据转换为符合第一批列类型的 Arrow 表"""
+        import pyarrow as pa
+
+        df = part[self.fields]
+        df.columns = self.headers
+        if self._schema is None:
+            self._schema = self._first_schema(df)
+        try:
+            return pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # 后续批次的值与第一批类型不一致（如第一批全为空的列后来出现数值），文本列按字符串写入
+            arrays = []
+            for (_, series), field in zip(df.items(), self._schema):
+                try:
+                    arrays.append(pa.array(series, type=field.type, from_pandas=True))
+                except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                    if not pa.types.is_string(field.type):
+                        raise Exception(f"列 {field.name} 的值与第一批数据的类型（{field.type}）不一致")
+                    values = series.astype(object).where(series.notna(), None)
+                    arrays.append(pa.array([None if value is None else str(value) for value in values],
+                                           type=pa.string()))
+            return pa.Table.from_arrays(arrays, schema=self._schema)
+
+    def _write_part(self, part):
+        import pyarrow.parquet as pq
+
+        with self._phase('convert', len(part)):
+            table = self._to_table(part)
+        with self._phase('write', len(part)):
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self._path, table.schema)
+            self._writer.write_table(table)
+
+    def _file_bytes(self):
+        return os.path.getsize(self._path) if os.path.exists(self._path) else 0
+
+    def _close_file(self):
+        if self._writer is None:
+            # 没有数据时写出只有列名的空文件
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = self._schema or pa.schema([(header, pa.string()) for header in self.headers])
+            pq.write_table(schema.empty_table(), self._path)
+            return
+        self._writer.close()
+
+
+def _write_sheet_part(df, fields, first_row, border):
+    """在写入进程中把一段数据生成工作表的 <row> XML，返回 (临时文件路径, 最后一行行号, 列宽估算)
+
+    使用与主进程相同顺序创建的格式（add_formats），单元格引用的 XF 序号一致；
+    文本写为内联字符串，不依赖主进程的共享字符串表。
+    """
+    workbook = xlsxwriter.Workbook(os.devnull, {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+    _, formats = add_formats(workbook, border)
+    worksheet = workbook.add_worksheet()
+    kinds = _plan_columns(df, fields)
+    columns = _convert_columns(worksheet, df, fields, kinds, formats)
+    _write_columns(worksheet, columns, len(df), first_row)
+    # 写出最后一行并关闭临时文件；工作簿本身不关闭，不生成 xlsx
+    worksheet._write_single_row()
+    worksheet._opt_close()
+    widths = ColumnWidths([''] * len(fields))
+    widths.update(df, fields, kinds)
+    return worksheet.row_data_filename, first_row + len(df) - 1, widths.widths
+
+
+class ParallelXlsxWriter(XlsxStreamWriter):
+    """实验性：在多个进程中并行生成工作表数据，再由主进程拼接并打包为一个工作簿
+
+    XlsxWriter 逐个单元格生成 XML，是读取足够快之后的瓶颈。这里把每 PARALLEL_PART_ROWS 行交给
+    进程池生成 <row> XML（constant_memory 模式的行数据临时文件），主进程按顺序把这些片段追加到
+    当前工作表的行数据文件中，工作簿的其余部分（格式、工作表列表、压缩打包）仍由 XlsxWriter 完成。
+    分表、分文件与断点续传的行为与 XlsxStreamWriter 相同；文本均写为内联字符串（不使用共享字符串表），
+    字节预算只计入已拼接的数据。数据需要序列化到写入进程，单核或小数据量时不会更快。
+    行数据文件的拼接依赖 XlsxWriter 的内部接口，requirements.txt 固定了测试过的版本范围。
+    """
+
+    def __init__(self, output_path, sheet_name, fields, headers=None, workers=None,
+                 part_rows=PARALLEL_PART_ROWS, **options):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.part_rows = part_rows
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        self._pending = collections.deque()
+        self._buffer = []
+        self._buffer_rows = 0
+        self._buffer_first_row = None
+        try:
+            super().__init__(output_path, sheet_name, fields, headers, **options)
+        except Exception:
+            self._pool.shutdown(cancel_futures=True)
+            raise
+
+    def _write_part(self, part):
+        """攒够 part_rows 行后提交给进程池；写入位置在提交时确定"""
+        if not self._buffer:
+            self._buffer_first_row = self._sheet_rows + 1  # +1 for header
+        self._buffer.append(part)
+        self._buffer_rows += len(part)
+        if self._buffer_rows >= self.part_rows:
+            self._submit()
+
+    def _submit(self):
+        """把缓冲的数据提交给进程池，排队的任务过多时先拼接最早的结果"""
+        if not self._buffer:
+            return
+        df = pd.concat(self._buffer) if len(self._buffer) > 1 else self._buffer[0]
+        self._buffer = []
+        self._buffer_rows = 0
+        with self._phase('convert', len(df)):
+            future = self._pool.submit(_write_sheet_part, df, self.fields, self._buffer_first_row,
+                                       self.style['border'])
+        self._pending.append((future, len(df)))
+        while len(self._pending) > self.workers * _PARALLEL_QUEUE_PER_WORKER:
+            self._collect()
+
+    def _collect(self):
+        """等待最早提交的任务完成，把它生成的行追加到当前工作表"""
+        future, rows = self._pending.popleft()
+        with self._phase('write', rows):
+            path, last_row, widths = future.result()
+            worksheet = self.worksheet
+            # 先写出尚在内存中的上一行（表头），之后的行都来自写入进程
+            worksheet._write_single_row(last_row)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    shutil.copyfileobj(f, worksheet.row_data_fh)
+            finally:
+                os.remove(path)
+            worksheet.dim_rowmax = max(worksheet.dim_rowmax or 0, last_row)
+            self._column_widths.merge(widths)
+
+    def _drain(self):
+        """提交剩余的缓冲数据并拼接全部结果（切换工作表或关闭工作簿前调用）"""
+        self._submit()
+        while self._pending:
+            self._collect()
+
+    def _add_sheet(self):
+        if self.worksheet is not None:
+            self._drain()
+        super()._add_sheet()
+
+    def _close_workbook(self):
+        self._drain()
+        super()._close_workbook()
+
+    def close(self):
+        """拼接剩余的数据并关闭工作簿，返回全部输出文件路径；之后结束写入进程"""
+        try:
+            return super().close()
+        finally:
+            self._pool.shutdown(cancel_futures=True)
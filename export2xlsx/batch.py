@@ -0,0 +1,141 @@
+"""多图层批量导出：在进程池中并行导出，每个图层生成独立的工作簿"""
+
+import collections
+import concurrent.futures
+import glob
+import os
+import re
+import time
+
+from .backends import OUTPUT_FORMATS
+from .core import export_layer
+from .reader import _has_module
+
+
+# 批量导出支持的图层文件类型
+SUPPORTED_EXTENSIONS = ('.shp', '.gpkg', '.geojson', '.kml')
+
+# 批量导出单个图层的结果
+BatchResult = collections.namedtuple('BatchResult', 'input_file layer output_paths error seconds')
+
+
+def _list_layers(path):
+    """列出 GeoPackage 中的全部图层；其他格式视为单图层"""
+    if not path.lower().endswith('.gpkg'):
+        return [None]
+    if _has_module('pyogrio'):
+        import pyogrio
+        return [str(name) for name in pyogrio.list_layers(path)[:, 0]]
+    import fiona
+    return list(fiona.listlayers(path))
+
+
+def _safe_file_name(name):
+    """去掉文件名中 Windows 不允许的字符"""
+    return re.sub(r'[\\/:*?"<>|]', '_', name).strip() or "layer"
+
+
+def _name_conflicts(name, used_names):
+    """name 是否与已分配的输出名或其拆分文件名（name_2、name_3 ...，见 writer._split_file_path）冲突"""
+    key = name.lower()
+    if key in used_names:
+        return True
+    match = re.fullmatch(r'(.+)_\d+', key)
+    if match and match.group(1) in used_names:
+        return True
+    split_name = re.compile(re.escape(key) + r'_\d+')
+    return any(split_name.fullmatch(used) for used in used_names)
+
+
+def plan_batch(source, output_dir, extension=".xlsx"):
+    """展开批量导出的输入（文件夹、通配符或 .gpkg），返回 [(输入文件, 图层, 输出文件)]
+
+    extension 为输出文件的扩展名（按输出格式，见 backends.OUTPUT_FORMATS）。
+    """
+    if os.path.isdir(source):
+        files = sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.lower().endswith(SUPPORTED_EXTENSIONS)
+        )
+    elif glob.has_magic(source):
+        files = sorted(path for path in glob.glob(source) if path.lower().endswith(SUPPORTED_EXTENSIONS))
+    else:
+        files = [source]
+    
+    jobs = []
+    used_names = set()
+    for path in files:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        layers = _list_layers(path)
+        for layer in layers:
+            name = stem if layer is None or len(layers) == 1 else f"{stem}_{layer}"
+            name = _safe_file_name(name)
+            # 同名图层（如 a.shp 与 a.geojson）改用带格式的名称（a_geojson），仍冲突时再追加 _v2、_v3 ...；
+            # 不能追加 _2 这类序号，否则会与另一个图层拆分出的 a_2.xlsx 相互覆盖
+            unique_name = name
+            if _name_conflicts(unique_name, used_names):
+                unique_name = name = _safe_file_name(f"{name}_{os.path.splitext(path)[1].lstrip('.')}")
+            index = 1
+            while _name_conflicts(unique_name, used_names):
+                index += 1
+                unique_name = f"{name}_v{index}"
+            used_names.add(unique_name.lower())
+            jobs.append((path, layer, os.path.join(output_dir, unique_name + extension)))
+    return jobs
+
+
+def _export_job(input_file, layer, output_path, options):
+    """进程池中执行的单个图层导出任务，返回 (输出文件列表, 耗时秒数)"""
+    start = time.perf_counter()
+    output_paths = export_layer(input_file, output_path, layer=layer, **options)
+    return output_paths, time.perf_counter() - start
+
+
+def export_batch(source, output_dir, workers=None, progress=None, **options):
+    """在进程池中并行导出多个图层，每个图层生成独立的工作簿
+
+    source 为文件夹、通配符或 .gpkg（导出其全部图层）；options 传给 export_layer。
+    progress(已完成数, 总数, BatchResult) 在每个图层完成后调用。返回 BatchResult 列表。
+    """
+    output_format = options.get('output_format') or 'xlsx'
+    if output_format not in OUTPUT_FORMATS:
+        raise Exception(f"未知的输出格式：{output_format}")
+    jobs = plan_batch(source, output_dir, OUTPUT_FORMATS[output_format])
+    if not jobs:
+        raise Exception("没有找到可导出的图层")
+    # 输出目录不存在时先创建；否则每个图层都要读写完才在保存时失败
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+    except OSError as e:
+        raise Exception(f"无法创建输出目录：{e}")
+    
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_export_job, input_file, layer, output_path, options): (input_file, layer)
+            for input_file, layer, output_path in jobs
+        }
+        for future in concurrent.futures.as_completed(futures):
+            input_file, layer = futures[future]
+            try:
+                output_paths, seconds = future.result()
+                result = BatchResult(input_file, layer, output_paths, None, seconds)
+            except Exception as e:
+                result = BatchResult(input_file, layer, [], str(e) or type(e).__name__, None)
+            results.append(result)
+            if progress:
+                progress(len(results), len(jobs), result)
+    return results
+
+
+def format_batch_summary(results):
+    """生成批量导出的汇总报告文本，列出失败的图层"""
+    failures = [r for r in results if r.error]
+    lines = [f"共 {len(results)} 个图层，成功 {len(results) - len(failures)} 个，失败 {len(failures)} 个"]
+    for result in failures:
+        name = os.path.basename(result.input_file)
+        if result.layer is not None:
+            name = f"{name}:{result.layer}"
+        lines.append(f"  {name}：{result.error}")
+    return "\n".join(lines)
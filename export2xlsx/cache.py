@@ -0,0 +1,153 @@
+"""增量导出缓存：按数据源指纹与导出选项缓存 XLSX，数据未变化时直接复用，目录大小超限时按最近使用淘汰"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+from .perf import user_data_dir
+from .writer import _split_file_path
+
+# 缓存目录默认上限
+DEFAULT_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+
+# 输出格式或写入逻辑变化时递增，使旧缓存失效
+_CACHE_VERSION = 2
+
+_META_FILE = 'meta.json'
+
+# 附属文件：Shapefile 的属性表、索引、坐标系与元数据，以及 SQLite（GeoPackage）的日志文件；
+# 只认这些扩展名，同名的导出结果（parcels.xlsx）、性能报告与断点记录不算附属文件
+_SIDECAR_SUFFIXES = ('.dbf', '.shx', '.prj', '.cpg', '.qix', '.sbn', '.sbx', '.shp.xml')
+_SQLITE_JOURNALS = ('-wal', '-shm')
+_HASH_BLOCK = 1024 * 1024
+
+
+def default_cache_dir():
+    """默认缓存目录（用户数据目录下的 cache）"""
+    return os.path.join(user_data_dir(), 'cache')
+
+
+def _sidecar_files(input_file):
+    """数据源的附属文件：同名的 _SIDECAR_SUFFIXES 文件（.dbf/.shx/.prj/.cpg 等）及 SQLite 的 -wal/-shm 日志"""
+    stem = os.path.splitext(input_file)[0]
+    files = [path for path in glob.glob(glob.escape(stem) + '.*') if path[len(stem):].lower() in _SIDECAR_SUFFIXES]
+    files += [input_file + suffix for suffix in _SQLITE_JOURNALS if os.path.exists(input_file + suffix)]
+    return sorted(files)
+
+
+def _file_hash(path):
+    """文件内容的哈希"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(input_file, layer=None, options=None):
+    """数据源与导出选项的指纹
+
+    包含主文件的路径、大小、修改时间，附属文件的内容哈希，以及影响输出内容的导出选项。
+    """
+    input_file = os.path.abspath(input_file)
+    stat = os.stat(input_file)
+    source = {
+        'version': _CACHE_VERSION,
+        'path': os.path.normcase(input_file),
+        'layer': layer,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sidecars': {os.path.basename(path): _file_hash(path) for path in _sidecar_files(input_file)},
+        'options': options or {},
+    }
+    text = json.dumps(source, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=20).hexdigest()
+
+
+class ExportCache:
+    """磁盘上的导出缓存
+
+    每个条目为 directory/<指纹>/ 下的分段文件与 meta.json；命中时把文件复制到输出路径，
+    存入后若目录总大小超过 max_bytes，按最近使用时间淘汰最旧的条目。
+    可安全地在批量导出的多个进程间共享（条目先写临时目录再改名）。
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_CACHE_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _entry_dir(self, key):
+        return os.path.join(self.directory, key)
+
+    def restore(self, key, output_path):
+        """命中时把缓存的文件复制到 output_path（多个分段依次为 name_2.xlsx ...），返回输出路径列表；未命中返回 None"""
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, _META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            output_paths = []
+            for index, name in enumerate(meta['files'], 1):
+                path = _split_file_path(output_path, index)
+                shutil.copyfile(os.path.join(entry_dir, name), path)
+                output_paths.append(path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # 更新最近使用时间，用于淘汰
+        try:
+            os.utime(os.path.join(entry_dir, _META_FILE))
+        except OSError:
+            pass
+        return output_paths
+
+    def store(self, key, output_paths):
+        """存入一次导出的结果，然后按大小上限淘汰旧条目"""
+        entry_dir = self._entry_dir(key)
+        tmp_dir = os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(tmp_dir)
+            names = []
+            for index, path in enumerate(output_paths, 1):
+                name = f"part{index}.xlsx"
+                shutil.copyfile(path, os.path.join(tmp_dir, name))
+                names.append(name)
+            with open(os.path.join(tmp_dir, _META_FILE), 'w', encoding='utf-8') as f:
+                json.dump({'files': names, 'created': time.time()}, f)
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.evict(keep=key)
+
+    def _entries(self):
+        """返回 [(最近使用时间, 大小, 条目目录)]"""
+        entries = []
+        for name in os.listdir(self.directory):
+            entry_dir = os.path.join(self.directory, name)
+            meta_path = os.path.join(entry_dir, _META_FILE)
+            if name.startswith('.') or not os.path.exists(meta_path):
+                continue
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(entry_dir))
+                entries.append((os.path.getmtime(meta_path), size, entry_dir))
+            except OSError:
+                continue
+        return entries
+
+    def evict(self, keep=None):
+        """按最近使用时间从旧到新删除条目，直到总大小不超过 max_bytes（keep 指定的条目保留）"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in entries:
+            if total <= self.max_bytes:
+                break
+            if os.path.basename(entry_dir) == keep:
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
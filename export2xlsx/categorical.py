@@ -0,0 +1,26 @@
+"""低基数文本列：读取时以分类编码保存，写入时经共享字符串表只编码一次不重复的值"""
+
+import numpy as np
+import pandas as pd
+
+# 不重复值不超过行数的这个比例时视为低基数列
+CATEGORY_MAX_RATIO = 0.5
+
+# 每个工作簿共享字符串表的不重复值上限；共享字符串表在关闭工作簿前常驻内存，超出后的列改为内联字符串
+SHARED_STRING_LIMIT = 200000
+
+
+def is_low_cardinality(distinct, rows):
+    """不重复值个数相对行数是否足够少，值得按分类处理"""
+    return rows > 0 and distinct <= rows * CATEGORY_MAX_RATIO
+
+
+def categorical_from_codes(codes, values):
+    """由编码（-1 为缺失值）与各编码对应的值构建 Categorical
+
+    values 可能含有重复值或 None（不同的原始值解码或映射后相同），先对这些值（不重复值个数级别）
+    再做一次 factorize 合并，不逐行处理。
+    """
+    remap, categories = pd.factorize(np.asarray(values, dtype=object))
+    remap = np.append(remap, -1)
+    return pd.Categorical.from_codes(remap[codes], categories)
@@ -0,0 +1,98 @@
+"""断点续传：分段导出时记录已完成的分段，中断后从最后一个完成的分段之后继续"""
+
+import json
+import os
+
+# 断点续传模式下默认每个分段文件的行数
+CHECKPOINT_ROWS = 100000
+
+_MANIFEST_VERSION = 1
+
+
+def manifest_path(output_path):
+    """输出文件对应的断点记录文件（导出完成后删除）"""
+    return output_path + ".checkpoint.json"
+
+
+def _source_signature(input_file, layer, fields, sheet_name, options):
+    """数据源与导出选项的签名；任何一项变化后旧的断点记录不再可用"""
+    paths = [input_file]
+    if input_file.lower().endswith('.shp'):
+        paths.append(input_file[:-4] + '.dbf')
+    stats = [os.stat(path) for path in paths if os.path.exists(path)]
+    return {
+        'input_file': os.path.abspath(input_file),
+        'layer': layer,
+        'fields': list(fields) if fields else None,
+        'sheet_name': sheet_name,
+        'options': options or {},
+        'source_size': sum(stat.st_size for stat in stats),
+        'source_mtime_ns': max((stat.st_mtime_ns for stat in stats), default=0),
+    }
+
+
+class Checkpoint:
+    """分段导出的断点记录
+
+    每个分段工作簿正常关闭后调用 record_part 追加记录并立即写盘；
+    下次以相同的数据源与选项导出时，从 rows_done 行、第 len(parts)+1 个分段继续。
+    """
+
+    def __init__(self, output_path, input_file, layer=None, fields=None, sheet_name="Sheet1", options=None):
+        self.path = manifest_path(output_path)
+        self.output_dir = os.path.dirname(output_path)
+        self.signature = _source_signature(input_file, layer, fields, sheet_name, options)
+        self.parts = []
+        self._load()
+
+    def _load(self):
+        """读取已有的断点记录；签名不符或分段文件缺失时从头开始"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get('version') != _MANIFEST_VERSION or manifest.get('signature') != self.signature:
+            return
+        parts = manifest.get('parts', [])
+        if all(os.path.exists(os.path.join(self.output_dir, part['path'])) for part in parts):
+            self.parts = parts
+
+    @property
+    def rows_done(self):
+        """已完成分段的总行数（续传时跳过的要素数）"""
+        return sum(part['rows'] for part in self.parts)
+
+    @property
+    def part_paths(self):
+        """已完成分段的文件路径"""
+        return [os.path.join(self.output_dir, part['path']) for part in self.parts]
+
+    def record_part(self, path, rows):
+        """记录一个已正常关闭的分段，并原子地写入断点记录；空分段不记录（续传时会被覆盖）"""
+        if not rows:
+            return
+        self.parts.append({'path': os.path.basename(path), 'rows': rows})
+        self._save()
+
+    def _save(self):
+        manifest = {'version': _MANIFEST_VERSION, 'signature': self.signature, 'parts': self.parts}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def finish(self, written_paths):
+        """导出全部完成后删除断点记录，返回全部分段路径
+
+        written_paths 为本次写出的文件；其中未记录的空分段（续传时已无剩余数据）被删除。
+        """
+        paths = self.part_paths or written_paths[:1]
+        for path in written_paths:
+            if path not in paths:
+                os.remove(path)
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        return paths
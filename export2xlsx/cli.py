@@ -0,0 +1,225 @@
+"""命令行入口：python -m export2xlsx 输入 输出 [选项]
+
+不带参数运行时启动图形界面；带参数时无需 Tk，适合服务器上的定时批量导出。
+"""
+
+import argparse
+import signal
+import sys
+import threading
+
+from .backends import OUTPUT_FORMATS
+from .cache import DEFAULT_CACHE_BYTES
+from .checkpoint import CHECKPOINT_ROWS
+from .geometry import GEOMETRY_COLUMNS, parse_geometry_columns
+from .reader import READ_ENGINES, parse_bbox
+from .tuning import DEFAULT_MEMORY_BUDGET
+from .writer import DEFAULT_STYLE, EXPORT_STYLES
+
+
+def _positive_int(text):
+    """argparse 参数类型：正整数"""
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("必须为正整数")
+    return value
+
+
+def _bbox(text):
+    """argparse 参数类型：minx,miny,maxx,maxy"""
+    try:
+        return parse_bbox(text)
+    except Exception as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _geometry_columns(text):
+    """argparse 参数类型：逗号分隔的几何派生列"""
+    try:
+        return parse_geometry_columns(text)
+    except Exception as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="python -m export2xlsx",
+        description="将GIS图层属性表导出为Excel文件（不带参数运行时启动图形界面）"
+    )
+    parser.add_argument("input", help="输入图层文件；--batch 时为文件夹、通配符或 GeoPackage")
+    parser.add_argument("output", nargs="?", help="输出文件（.xlsx/.csv/.parquet）；--batch 时为输出文件夹")
+    parser.add_argument("-f", "--fields", help="要导出的字段，逗号分隔（默认全部属性字段）")
+    parser.add_argument("-l", "--layer", help="图层名称（多图层数据源）")
+    parser.add_argument("-s", "--sheet", default="Sheet1", help="Sheet名称（默认 Sheet1）")
+    parser.add_argument("--alias", action="store_true", help="使用字段别名作为列名称")
+    parser.add_argument("--domain", action="store_true", help="将带值域的字段编码替换为描述")
+    parser.add_argument("-w", "--where", help="只导出满足 SQL WHERE 条件的要素，如 \"STATUS = 'active'\"；"
+                                              "中文字段名需用双引号括起，如 \"行政区\" = '城关区'")
+    parser.add_argument("--bbox", type=_bbox, metavar="MINX,MINY,MAXX,MAXY",
+                        help="只导出与该范围相交的要素（与图层使用相同的坐标系）")
+    parser.add_argument("--mask", metavar="FILE|WKT",
+                        help="只导出与该面图层（全部要素合并）或 WKT 几何相交的要素（与图层使用相同的坐标系）")
+    parser.add_argument("--geometry", type=_geometry_columns, metavar="COLUMNS",
+                        help=f"追加由几何计算的列，逗号分隔（可选 {','.join(GEOMETRY_COLUMNS)}）")
+    parser.add_argument("--crs", help="计算几何列前先投影到该坐标系，如 EPSG:4547（面积、长度为该坐标系的单位）")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, dest="output_format",
+                        help="输出格式（默认按输出文件扩展名，批量导出默认 xlsx）：csv 为 UTF-8 带 BOM，"
+                             "parquet 需要 pyarrow，xlsx-parallel 为实验性的多进程 XLSX 写入")
+    parser.add_argument("--style", choices=EXPORT_STYLES, default=DEFAULT_STYLE,
+                        help="导出样式：fast 无单元格边框、低压缩级别（最快），balanced 无边框（文件最小），"
+                             f"styled 每个单元格带边框（默认 {DEFAULT_STYLE}）")
+    parser.add_argument("--chunk-size", type=_positive_int, help="每次写入的行数（默认 5000，且不超过每批读取行数）")
+    parser.add_argument("--batch-size", type=_positive_int, help="每批读取的行数（默认按行宽与内存预算自动选择）")
+    parser.add_argument("--memory-mb", type=_positive_int, default=DEFAULT_MEMORY_BUDGET // (1024 * 1024),
+                        help=f"每批数据的目标内存（MB，默认 {DEFAULT_MEMORY_BUDGET // (1024 * 1024)}）")
+    parser.add_argument("--engine", choices=READ_ENGINES, default="auto",
+                        help="读取引擎（默认 auto；Shapefile 优先使用 dbf 直接读取属性表）")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="后台线程预读下一批数据，与写入重叠（适合网络路径等读取较慢的数据源）")
+    parser.add_argument("--max-rows-per-file", type=_positive_int, help="单个文件最大行数，超过后拆分为多个文件")
+    parser.add_argument("--max-bytes-per-file", type=_positive_int,
+                        help="单个文件最大字节数（按未压缩工作表数据估算），超过后拆分为多个文件")
+    parser.add_argument("--checkpoint", nargs="?", type=_positive_int, const=CHECKPOINT_ROWS, metavar="ROWS",
+                        help=f"断点续传：每 ROWS 行（默认 {CHECKPOINT_ROWS}）保存一个分段文件，中断后以相同参数重新运行即可继续")
+    parser.add_argument("--cache", nargs="?", const="", metavar="DIR",
+                        help="数据源与选项未变化时直接复用上次的导出结果（默认缓存目录位于用户数据目录下）")
+    parser.add_argument("--cache-size", type=_positive_int, default=DEFAULT_CACHE_BYTES // (1024 * 1024), metavar="MB",
+                        help=f"缓存目录上限（MB，默认 {DEFAULT_CACHE_BYTES // (1024 * 1024)}），超过后淘汰最久未使用的结果")
+    parser.add_argument("--batch", action="store_true", help="批量导出：每个图层导出为独立的工作簿")
+    parser.add_argument("-j", "--workers", type=_positive_int, help="批量导出的并行进程数（默认 CPU 核数）")
+    parser.add_argument("--profile", nargs="?", const="", metavar="JSON",
+                        help="记录各阶段耗时与内存：摘要输出到标准错误，报告写入 JSON（默认为输出文件旁的 .perf.json）")
+    parser.add_argument("--list-fields", action="store_true", help="只列出图层的字段、类型、别名和要素数")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出进度信息")
+    return parser
+
+
+def _print_schema(input_file, layer):
+    """输出图层结构，制表符分隔：字段名、类型、别名、值域项数"""
+    from .schema import read_schema
+    
+    schema = read_schema(input_file, layer)
+    for field in schema.fields:
+        domain = f"值域 {len(field.domain)} 项" if field.domain else ""
+        print(f"{field.name}\t{field.dtype}\t{field.alias or ''}\t{domain}")
+    if schema.feature_count is not None:
+        print(f"共 {len(schema.fields)} 个字段，{schema.feature_count} 条要素", file=sys.stderr)
+
+
+def _print_progress(done, total):
+    """在终端同一行刷新进度"""
+    text = f"{done}/{total} 行" if total else f"{done} 行"
+    sys.stderr.write(f"\r正在导出... {text}")
+    sys.stderr.flush()
+
+
+def main(argv=None):
+    """命令行主函数，返回进程退出码"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        from .gui import export_to_xlsx
+        
+        export_to_xlsx()
+        return 0
+    
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.list_fields:
+        try:
+            _print_schema(args.input, args.layer)
+            return 0
+        except Exception as e:
+            print(f"读取图层结构失败：{e}", file=sys.stderr)
+            return 1
+    if not args.output:
+        parser.error("缺少输出路径 output")
+    if args.batch and args.profile is not None:
+        parser.error("--profile 只用于单个图层导出")
+    
+    options = {
+        'sheet_name': args.sheet,
+        'use_alias': args.alias,
+        'use_domain': args.domain,
+        'style': args.style,
+        'output_format': args.output_format,
+        'where': args.where,
+        'bbox': args.bbox,
+        'geometry_columns': args.geometry,
+        'crs': args.crs,
+        'chunk_size': args.chunk_size,
+        'batch_size': args.batch_size,
+        'memory_budget': args.memory_mb * 1024 * 1024,
+        'pipeline': args.pipeline,
+        'engine': args.engine,
+        'max_rows_per_file': args.max_rows_per_file,
+        'max_bytes_per_file': args.max_bytes_per_file,
+        'checkpoint_rows': args.checkpoint,
+    }
+    if args.cache is not None:
+        from .cache import ExportCache
+        
+        options['cache'] = ExportCache(args.cache or None, args.cache_size * 1024 * 1024)
+    if args.fields:
+        options['fields'] = [field.strip() for field in args.fields.split(",") if field.strip()]
+    
+    try:
+        if args.mask:
+            from .reader import read_mask
+            
+            options['mask'] = read_mask(args.mask)
+        if args.batch:
+            from .batch import export_batch, format_batch_summary
+            
+            def on_layer_done(done, total, result):
+                if not args.quiet:
+                    state = f"失败：{result.error}" if result.error else f"完成（{result.seconds:.1f} 秒）"
+                    layer = f":{result.layer}" if result.layer is not None else ""
+                    print(f"[{done}/{total}] {result.input_file}{layer} {state}", file=sys.stderr)
+            
+            results = export_batch(args.input, args.output, workers=args.workers,
+                                   progress=on_layer_done, **options)
+            print(format_batch_summary(results))
+            return 1 if any(result.error for result in results) else 0
+        
+        from .core import ExportCancelled, export_layer
+        from .perf import ExportProfile
+        
+        tty = sys.stderr.isatty() and not args.quiet
+        profile = ExportProfile() if args.profile is not None else None
+        
+        # Ctrl+C 先请求导出在当前块写完后停止（断点续传时保存已完成的分段），再按一次立即中断
+        cancel_event = threading.Event()
+        
+        def on_interrupt(signum, frame):
+            cancel_event.set()
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+        
+        # 只有主线程能设置信号处理函数（被其他程序在线程中调用时保持默认行为）
+        in_main_thread = threading.current_thread() is threading.main_thread()
+        previous_handler = signal.signal(signal.SIGINT, on_interrupt) if in_main_thread else None
+        try:
+            output_paths = export_layer(args.input, args.output, layer=args.layer,
+                                        progress=_print_progress if tty else None, profile=profile,
+                                        cancel_event=cancel_event, **options)
+        except ExportCancelled:
+            if tty:
+                sys.stderr.write("\n")
+            hint = "，以相同参数重新运行可继续" if args.checkpoint else ""
+            print(f"导出已取消{hint}", file=sys.stderr)
+            return 130
+        finally:
+            if in_main_thread:
+                signal.signal(signal.SIGINT, previous_handler)
+        if tty:
+            sys.stderr.write("\n")
+        for path in output_paths:
+            print(path)
+        if profile is not None:
+            report_path = profile.write_json(args.profile or args.output + ".perf.json")
+            print(profile.summary(), file=sys.stderr)
+            print(f"性能报告：{report_path}", file=sys.stderr)
+        return 0
+    except Exception as e:
+        print(f"导出失败：{e}", file=sys.stderr)
+        return 1
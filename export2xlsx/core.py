@@ -0,0 +1,286 @@
+"""单个图层导出流程（不依赖界面）"""
+
+import functools
+import hashlib
+import itertools
+import os
+
+from .backends import OUTPUT_FORMATS, open_writer, output_format_for
+from .cache import fingerprint
+from .checkpoint import Checkpoint
+from .domains import build_lookups, decode_domains
+from .geometry import EXCEL_MAX_STRING, GEOMETRY_COLUMN, GEOMETRY_COLUMNS, add_geometry_columns, make_transformer
+from .perf import null_phase
+from .pipeline import Prefetcher
+from .reader import READ_BATCH_SIZE, _feature_count, _iter_opened_batches, _layer_crs, _open_batches
+from .schema import read_schema
+from .tuning import DEFAULT_MEMORY_BUDGET, MemoryGuard, ProgressThrottle, auto_batch_size
+from .writer import DEFAULT_STYLE
+
+# 每次写入与更新进度的最大行数
+WRITE_CHUNK_SIZE = 5000
+
+
+class ExportCancelled(Exception):
+    """导出被取消（cancel_event 被置位）"""
+
+
+def _layer_schema(input_file, layer):
+    """读取图层结构（有缓存），无法读取时返回 None"""
+    try:
+        return read_schema(input_file, layer)
+    except Exception:
+        return None
+
+
+def _auto_batch_size(schema, fields, memory_budget, geometry=False):
+    """按图层结构估算行宽并选择每批行数（geometry 为 True 时计入几何）；无法读取结构时使用默认值"""
+    if schema is None:
+        return READ_BATCH_SIZE
+    selected = set(fields) if fields else None
+    dtypes = [field.dtype for field in schema.fields if selected is None or field.name in selected]
+    if geometry:
+        dtypes.append('geometry')
+    return auto_batch_size(dtypes or ['object'], memory_budget)
+
+
+def _filter_options(where, bbox, mask):
+    """筛选条件在缓存指纹与断点记录中的表示（范围几何取 WKB 的哈希）"""
+    return {
+        'where': where or None,
+        'bbox': list(bbox) if bbox is not None else None,
+        'mask': hashlib.blake2b(mask.wkb, digest_size=16).hexdigest() if mask is not None else None,
+    }
+
+
+def export_layer(input_file, output_path, fields=None, layer=None, sheet_name="Sheet1",
+                 chunk_size=None, batch_size=None, engine='auto', memory_budget=DEFAULT_MEMORY_BUDGET,
+                 max_rows_per_file=None, max_bytes_per_file=None, progress=None, status=None, profile=None,
+                 pipeline=False, cancel_event=None, checkpoint_rows=None, cache=None,
+                 use_alias=False, use_domain=False, style=DEFAULT_STYLE, where=None, bbox=None, mask=None,
+                 geometry_columns=None, crs=None, output_format=None):
+    """将图层属性表导出为 XLSX（不依赖界面），返回输出文件路径列表
+
+    fields 为 None 时导出全部属性字段；engine 为 auto/dbf/arrow/pyogrio/fiona；
+    use_alias 为 True 时以字段别名作为列标题，use_domain 为 True 时把带值域的字段编码替换为描述
+    （目前读取 GeoPackage 的 gpkg_data_columns 与 gpkg_data_column_constraints）；
+    style 为导出样式：fast（无单元格边框、低压缩级别，最快）、balanced（无边框，文件最小）、styled（带边框）；
+    where（SQL WHERE 条件，如 "STATUS = 'active'"）、bbox（minx, miny, maxx, maxy）、mask（shapely 几何）
+    只导出满足条件的要素，筛选交给 OGR 驱动完成（此时不使用 dbf 引擎）；
+    geometry_columns 为要追加的几何派生列（geometry.GEOMETRY_COLUMNS 的键，如 ['area', 'centroid_x']），
+    按批由几何计算，crs（如 "EPSG:4547"）给出时先投影到该坐标系，面积与长度为该坐标系的单位；
+    output_format 为 backends.OUTPUT_FORMATS 中的输出格式（xlsx/csv/parquet/xlsx-parallel），
+    None 时按 output_path 的扩展名选择；CSV 与 Parquet 不使用 sheet_name 与 style；
+    batch_size 为 None 时按行宽与 memory_budget（字节）自动选择，chunk_size 默认不超过 WRITE_CHUNK_SIZE；
+    progress(已写行数, 总行数或None) 与 status(文本) 为可选的进度回调；
+    传入 profile（perf.ExportProfile）时记录读取、选列、转换、写入、压缩保存各阶段的耗时；
+    pipeline 为 True 时在后台线程预读后续批次（最多领先 2 批），使读取与写入重叠进行；
+    XlsxWriter 写单元格时持有 GIL，本地文件上收益有限，适合读取较慢的网络路径等数据源。
+    
+    cancel_event（threading.Event）被置位后在当前块写完时停止并抛出 ExportCancelled。
+    设置 checkpoint_rows 时为断点续传模式：每 checkpoint_rows 行保存为一个分段文件
+    （name.xlsx、name_2.xlsx ...），完成的分段记录在 name.xlsx.checkpoint.json 中；
+    中断或取消后以相同参数再次导出时，从最后一个完成的分段之后继续。
+    传入 cache（cache.ExportCache）时，数据源与导出选项都未变化则直接复制缓存的结果。
+    """
+    status = status or (lambda text: None)
+    phase = profile.phase if profile is not None else null_phase
+    # 先检查输出目录，否则要读写完整个图层后才在保存时失败
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    if not os.path.isdir(output_dir):
+        raise Exception(f"输出目录不存在：{output_dir}")
+    schema = _layer_schema(input_file, layer)
+    geometry_columns = [key for key in GEOMETRY_COLUMNS if key in (geometry_columns or ())]
+    if batch_size is None:
+        batch_size = _auto_batch_size(schema, fields, memory_budget, bool(geometry_columns))
+    chunk_size = chunk_size or min(batch_size, WRITE_CHUNK_SIZE)
+    output_format = output_format or output_format_for(output_path)
+    
+    # 数据源与影响输出内容的选项都未变化时直接使用缓存
+    cache_key = None
+    if cache is not None:
+        cache_key = fingerprint(input_file, layer, {
+            'fields': list(fields) if fields else None,
+            'sheet_name': sheet_name,
+            'max_rows_per_file': max_rows_per_file,
+            'max_bytes_per_file': max_bytes_per_file,
+            'checkpoint_rows': checkpoint_rows,
+            'use_alias': use_alias,
+            'use_domain': use_domain,
+            'style': style,
+            **_filter_options(where, bbox, mask),
+            'geometry_columns': geometry_columns,
+            'crs': crs,
+            'output_format': output_format,
+        })
+        output_paths = cache.restore(cache_key, output_path)
+        if output_paths is not None:
+            status("数据未变化，已使用缓存的导出结果")
+            if profile is not None:
+                profile.finish(input_file=input_file, layer=layer, output_paths=output_paths, cached=True)
+            return output_paths
+    
+    checkpoint = None
+    rows_done = 0
+    if checkpoint_rows:
+        checkpoint = Checkpoint(output_path, input_file, layer, fields, sheet_name,
+                                {'use_alias': use_alias, 'use_domain': use_domain, 'style': style,
+                                 **_filter_options(where, bbox, mask),
+                                 'geometry_columns': geometry_columns, 'crs': crs,
+                                 'output_format': output_format})
+        rows_done = checkpoint.rows_done
+        max_rows_per_file = min(max_rows_per_file or checkpoint_rows, checkpoint_rows)
+        if rows_done:
+            status(f"从第 {rows_done + 1} 行继续导出...")
+    
+    # 几何派生列的坐标转换只创建一次；XLSX 单元格放不下的 WKT 替换为提示文本并计数
+    transformer = None
+    if geometry_columns and crs:
+        transformer = make_transformer(_layer_crs(input_file, layer), crs)
+    max_wkt_length = EXCEL_MAX_STRING if OUTPUT_FORMATS.get(output_format) == '.xlsx' else None
+    wkt_too_long = 0
+    
+    # 按批流式读取选中的属性列；只有需要几何派生列时才读取几何
+    prefetched = None
+    read_phase = phase
+    read_args = (input_file, fields, layer, batch_size, engine, status, rows_done, where, bbox, mask,
+                 bool(geometry_columns))
+    if pipeline:
+        # 后台线程读取后续批次，写入线程只需从有界队列中取出；数据源在读取线程中打开，
+        # 打开、读取与关闭都在同一线程（fiona 的 GDAL 环境按线程保存，跨线程关闭会出错）
+        prefetched = batches = Prefetcher(functools.partial(_iter_opened_batches, *read_args),
+                                          phase=phase, cancel_event=cancel_event)
+        read_phase = null_phase
+        first_batch = next(prefetched, None)
+        if first_batch is None:
+            prefetched.close()
+            raise ExportCancelled("导出已取消")
+    else:
+        with phase('read'):
+            first_batch, batches = _open_batches(*read_args)
+    
+    try:
+        # 检查选中的字段是否存在
+        with phase('select'):
+            available_fields = []
+            for field in (fields or first_batch.columns):
+                if field in first_batch.columns and field != GEOMETRY_COLUMN:
+                    available_fields.append(field)
+        
+        if not available_fields and not geometry_columns:
+            raise Exception("选中的字段在数据中不存在")
+        if geometry_columns and GEOMETRY_COLUMN not in first_batch.columns:
+            raise Exception("图层没有几何，无法计算几何列")
+        
+        # 别名作为列标题；值域查找表每个字段只构建一次
+        schema_fields = {field.name: field for field in schema.fields} if schema is not None else {}
+        headers = None
+        if use_alias:
+            headers = [getattr(schema_fields.get(field), 'alias', None) or field for field in available_fields]
+        lookups = {}
+        if use_domain:
+            lookups = build_lookups([schema_fields[field] for field in available_fields if field in schema_fields])
+        
+        # 几何派生列追加在属性列之后
+        output_fields = available_fields + [GEOMETRY_COLUMNS[key] for key in geometry_columns]
+        if headers is not None:
+            headers += [GEOMETRY_COLUMNS[key] for key in geometry_columns]
+        
+        status("正在导出到Excel...")
+        filtered = bool(where) or bbox is not None or mask is not None
+        total_rows = _feature_count(input_file, layer, filtered)
+        throttle = ProgressThrottle(progress)
+        memory_guard = MemoryGuard(memory_budget)
+        
+        # 逐批导出，读一批写一批（默认使用XlsxWriter）
+        writer = open_writer(output_format, output_path, sheet_name, output_fields, headers, style=style,
+                             max_rows_per_file=max_rows_per_file, max_bytes_per_file=max_bytes_per_file,
+                             profile=profile,
+                             first_file_index=len(checkpoint.parts) + 1 if checkpoint else 1,
+                             on_file_closed=checkpoint.record_part if checkpoint else None)
+    except BaseException:
+        # 开始写入前出错时停止读取线程
+        if prefetched is not None:
+            prefetched.close()
+        raise
+    batches = itertools.chain([first_batch], batches)
+    first_batch = None
+    try:
+        # 分批写入数据
+        while True:
+            with read_phase('read'):
+                batch = next(batches, None)
+            if batch is None:
+                # 预读线程因取消而停止时同样没有后续批次，不能当作数据已读完
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExportCancelled("导出已取消")
+                break
+            if profile is not None:
+                profile.add_rows('read', len(batch))
+            for start_idx in range(0, len(batch), chunk_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExportCancelled("导出已取消")
+                
+                with phase('select', min(chunk_size, len(batch) - start_idx)):
+                    chunk = batch.iloc[start_idx:start_idx + chunk_size]
+                if lookups:
+                    with phase('decode', len(chunk)):
+                        chunk = decode_domains(chunk, lookups)
+                if geometry_columns:
+                    with phase('geometry', len(chunk)):
+                        chunk, too_long = add_geometry_columns(chunk, geometry_columns, transformer, max_wkt_length)
+                        wkt_too_long += too_long
+                writer.write_batch(chunk)
+                chunk = None
+                
+                # 更新进度（按时间节流）
+                throttle.update(rows_done + writer.rows_written, total_rows)
+            
+            # 写完即释放本批数据；只有内存超过阈值时才做垃圾回收
+            batch = None
+            memory_guard.check()
+        
+        throttle.update(rows_done + writer.rows_written, total_rows, force=True)
+    except ExportCancelled:
+        # 断点续传模式下正常关闭当前分段并记录，下次从这里继续；否则删除不完整的输出
+        if checkpoint is None:
+            writer.on_file_closed = None
+        try:
+            writer.close()
+        except Exception:
+            pass
+        if checkpoint is None:
+            for path in writer.output_paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        raise
+    except Exception:
+        # 出错时当前分段可能不完整，不记录为已完成
+        writer.on_file_closed = None
+        try:
+            writer.close()
+        except Exception:
+            pass
+        raise
+    finally:
+        # 停止读取线程（出错时可能仍在预读）
+        if prefetched is not None:
+            prefetched.close()
+    
+    output_paths = writer.close()
+    if checkpoint is not None:
+        output_paths = checkpoint.finish(output_paths)
+    if cache is not None:
+        cache.store(cache_key, output_paths)
+    if wkt_too_long:
+        status(f"有 {wkt_too_long} 个几何的 WKT 超过 Excel 单元格上限（{EXCEL_MAX_STRING} 字符），已替换为提示文本；"
+               f"需要完整 WKT 时请导出为 CSV 或 Parquet")
+    if profile is not None:
+        profile.finish(input_file=input_file, layer=layer, output_paths=output_paths, rows=writer.rows_written,
+                       fields=len(output_fields), engine=engine, batch_size=batch_size, chunk_size=chunk_size,
+                       pipeline=pipeline, output_format=output_format, style=style, where=where, bbox=bbox, masked=mask is not None,
+                       geometry_columns=geometry_columns, crs=crs, wkt_too_long=wkt_too_long,
+                       resumed_from=rows_done)
+    return output_paths
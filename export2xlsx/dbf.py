@@ -0,0 +1,270 @@
+"""DBF（Shapefile 属性表）读取：文件头解析与按列向量化解码的内存映射读取器
+
+不经过 GDAL，直接将 .dbf 的定长记录内存映射为二维字节数组，
+按字段切片后整列解码，适合只导出属性的 Shapefile。
+"""
+
+import codecs
+import collections
+import mmap
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from .categorical import categorical_from_codes, is_low_cardinality
+
+# DBF 字段描述
+DbfField = collections.namedtuple('DbfField', 'name type length decimals offset')
+
+# DBF 文件头：记录数、头长度、记录长度、字段列表与属性值编码
+DbfHeader = collections.namedtuple('DbfHeader', 'record_count header_length record_length fields encoding')
+
+# 文件头第 29 字节（语言驱动 ID）与编码的对应关系，参照 GDAL 的处理
+_LDID_ENCODINGS = {
+    0x01: 'cp437',
+    0x02: 'cp850',
+    0x03: 'cp1252',
+    0x4D: 'gbk',
+    0x4E: 'cp949',
+    0x4F: 'big5',
+    0x57: 'cp1252',
+    0x7A: 'gbk',
+    0x7B: 'cp949',
+    0x7C: 'cp874',
+    0xC8: 'cp1250',
+    0xC9: 'cp1251',
+}
+
+# 无编码信息时，按前这么多条记录的字符型字段猜测编码
+_GUESS_SAMPLE_RECORDS = 1000
+
+# .cpg 中常见的代码页写法
+_CODEPAGE_ALIASES = {
+    '65001': 'utf-8',
+    '936': 'gbk',
+    '950': 'big5',
+    '949': 'cp949',
+    '932': 'cp932',
+}
+
+
+def _normalize_codepage(text):
+    """将 .cpg 内容（如 UTF-8、GBK、936、ANSI 936）转换为 Python 编码名"""
+    text = text.strip()
+    if text.upper().startswith('ANSI '):
+        text = text[5:].strip()
+    if text.isdigit():
+        text = _CODEPAGE_ALIASES.get(text, f'cp{text}')
+    try:
+        return codecs.lookup(text).name
+    except LookupError:
+        return None
+
+
+def dbf_encoding(dbf_path, ldid=0):
+    """确定 DBF 的属性值编码：优先 .cpg，其次语言驱动 ID，都没有时返回 None"""
+    cpg_path = os.path.splitext(dbf_path)[0] + '.cpg'
+    if os.path.exists(cpg_path):
+        with open(cpg_path, 'r', encoding='ascii', errors='ignore') as f:
+            encoding = _normalize_codepage(f.read())
+        if encoding:
+            return encoding
+    return _LDID_ENCODINGS.get(ldid)
+
+
+def _sample_text_values(dbf_path, header_length, record_length, record_count, text_fields):
+    """读取前 _GUESS_SAMPLE_RECORDS 条记录中字符型字段（(偏移, 长度) 列表）的原始字节，去掉尾部填充"""
+    with open(dbf_path, 'rb') as f:
+        f.seek(header_length)
+        data = f.read(record_length * min(record_count, _GUESS_SAMPLE_RECORDS))
+    values = []
+    for start in range(0, len(data) - record_length + 1, record_length):
+        for offset, length in text_fields:
+            values.append(data[start + offset:start + offset + length].rstrip(b' \x00'))
+    return values
+
+
+def _guess_encoding(values):
+    """无编码信息时的猜测：字段名与字符型字段取值中含非 ASCII 字节，且都是合法的 UTF-8 时用 UTF-8，否则按 GBK
+
+    只看字段名不够：英文字段名总能按 UTF-8 解码，GBK 的属性值会被错误地替换为乱码。
+    定长字段可能截断在多字节字符中间，末尾不完整的 UTF-8 序列不视为错误。
+    """
+    non_ascii = [value for value in values if not value.isascii()]
+    if not non_ascii:
+        return 'gbk'
+    for value in non_ascii:
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(value)
+        except UnicodeDecodeError:
+            return 'gbk'
+    return 'utf-8'
+
+
+def read_dbf_header(dbf_path, encoding=None):
+    """只读取 DBF 文件头（字段定义与记录数），不读取任何记录"""
+    with open(dbf_path, 'rb') as f:
+        head = f.read(32)
+        if len(head) < 32:
+            raise Exception("DBF文件头不完整")
+        record_count, header_length, record_length = struct.unpack('<IHH', head[4:12])
+        descriptors = f.read(header_length - 32)
+    
+    raw_fields = []
+    offset = 1  # 每条记录首字节为删除标记
+    for start in range(0, len(descriptors) - 31, 32):
+        descriptor = descriptors[start:start + 32]
+        if descriptor[0] == 0x0D:
+            break
+        raw_name = descriptor[:11].split(b'\x00', 1)[0]
+        field_type = chr(descriptor[11]).upper()
+        length = descriptor[16]
+        decimals = descriptor[17]
+        raw_fields.append((raw_name, field_type, length, decimals, offset))
+        offset += length
+    
+    encoding = encoding or dbf_encoding(dbf_path, head[29])
+    if not encoding:
+        # 没有 .cpg 与语言驱动 ID 时按字段名和记录中字符型字段的字节猜测
+        text_fields = [(field[4], field[2]) for field in raw_fields if field[1] == 'C']
+        samples = _sample_text_values(dbf_path, header_length, record_length, record_count, text_fields)
+        encoding = _guess_encoding([field[0] for field in raw_fields] + samples)
+    fields = [
+        DbfField(raw_name.decode(encoding, errors='replace').strip(), field_type, length, decimals, field_offset)
+        for raw_name, field_type, length, decimals, field_offset in raw_fields
+    ]
+    return DbfHeader(record_count, header_length, record_length, fields, encoding)
+
+
+def dbf_field_dtype(field):
+    """DBF 字段类型对应的 pandas dtype 名称"""
+    if field.type == 'N':
+        return 'int64' if field.decimals == 0 and field.length < 19 else 'float64'
+    if field.type in ('F', 'B', 'O'):
+        return 'float64'
+    if field.type == 'I':
+        return 'int32'
+    if field.type == 'D':
+        return 'datetime64[ms]'
+    if field.type == 'L':
+        return 'bool'
+    return 'object'
+
+
+def _decode_text(raw, encoding):
+    """解码字符型字段：只解码不重复的值，再按编码映射回整列
+
+    先将尾部填充空格整块置零（定长字节串会自动去掉尾部的 0），
+    再把不重复的值用空字符拼接后一次性解码，避免逐个调用 decode。
+    不重复值较少时返回 Categorical，否则返回 object 数组。
+    """
+    raw = np.array(raw)
+    padding = np.logical_and.accumulate(((raw == 0x20) | (raw == 0))[:, ::-1], axis=1)[:, ::-1]
+    raw[padding] = 0
+    values = raw.view(f'S{raw.shape[1]}').ravel()
+    
+    codes, uniques = pd.factorize(values)
+    uniques = uniques.tolist()
+    decoded = b'\x00'.join(uniques).decode(encoding, errors='replace').split('\x00')
+    if len(decoded) != len(uniques):
+        # 值中含有空字符时逐个解码
+        decoded = [value.decode(encoding, errors='replace') for value in uniques]
+    decoded = [value or None for value in decoded]
+    if is_low_cardinality(len(decoded), len(codes)):
+        # 低基数列（行政区名、地类等）保存为分类，不展开为逐行的 str 对象
+        return categorical_from_codes(codes, decoded)
+    result = np.array(decoded + [None], dtype=object)
+    # factorize 对缺失值返回 -1，正好取到末尾的 None
+    return result[codes]
+
+
+def _decode_number(values, blank, field):
+    """解码数值型字段：空白为缺失值，整数字段无缺失时保留 int64"""
+    if field.decimals == 0 and field.length < 19 and not blank.any():
+        try:
+            return values.astype(np.int64)
+        except ValueError:
+            pass
+    values = values.copy()
+    values[blank] = b'nan'
+    try:
+        return values.astype(np.float64)
+    except ValueError:
+        # 存在溢出标记（如 *****）等非法值时逐个容错解析
+        text = pd.Series(values).str.decode('ascii', errors='ignore')
+        return pd.to_numeric(text, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _decode_field(block, field, encoding):
+    """从记录块中切出一个字段并整列解码"""
+    raw = block[:, field.offset:field.offset + field.length]
+    values = np.ascontiguousarray(raw).view(f'S{field.length}').ravel()
+    
+    if field.type in ('N', 'F'):
+        blank = ((raw == 0x20) | (raw == 0)).all(axis=1)
+        return _decode_number(values, blank, field)
+    if field.type == 'D':
+        if (raw >= 0x80).any():
+            # 非 ASCII 或损坏的字节无法按日期解析，替换后由 to_datetime 置为缺失值，不中断整个导出
+            raw = np.where(raw >= 0x80, np.uint8(ord('?')), raw)
+            values = np.ascontiguousarray(raw).view(f'S{field.length}').ravel()
+        text = pd.Series(values.astype('U8'))
+        return pd.to_datetime(text, format='%Y%m%d', errors='coerce').to_numpy()
+    if field.type == 'L':
+        flags = raw[:, 0]
+        result = np.full(len(flags), None, dtype=object)
+        result[np.isin(flags, np.frombuffer(b'TtYy', dtype=np.uint8))] = True
+        result[np.isin(flags, np.frombuffer(b'FfNn', dtype=np.uint8))] = False
+        return result
+    if field.type == 'I' and field.length == 4:
+        return np.ascontiguousarray(raw).view('<i4').ravel()
+    if field.type in ('O', 'B') and field.length == 8:
+        return np.ascontiguousarray(raw).view('<f8').ravel()
+    return _decode_text(raw, encoding)
+
+
+def iter_dbf_batches(dbf_path, columns=None, batch_size=10000, start=0, encoding=None):
+    """内存映射读取 DBF，按批产出 DataFrame
+
+    columns 为 None 时读取全部字段，不存在的字段忽略；已删除的记录跳过。
+    start 为跳过的有效记录数（不含已删除的记录），用于断点续传。至少产出一批（可能为空）。
+    """
+    header = read_dbf_header(dbf_path, encoding)
+    fields = header.fields
+    if columns is not None:
+        by_name = {field.name: field for field in fields}
+        fields = [by_name[name] for name in columns if name in by_name]
+    
+    # 文件被截断时以实际可读的记录数为准
+    available = (os.path.getsize(dbf_path) - header.header_length) // max(header.record_length, 1)
+    record_count = max(min(header.record_count, available), 0)
+    
+    empty = pd.DataFrame({field.name: pd.Series(dtype=dbf_field_dtype(field)) for field in fields})
+    if record_count <= start:
+        yield empty
+        return
+    
+    with open(dbf_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        records = np.frombuffer(mapped, dtype=np.uint8, count=record_count * header.record_length,
+                                offset=header.header_length).reshape(record_count, header.record_length)
+        block = valid = None
+        try:
+            if start:
+                # 按有效记录计数，定位第 start 条有效记录所在的物理位置
+                valid = np.flatnonzero(records[:, 0] != ord('*'))
+                if start >= len(valid):
+                    yield empty
+                    return
+                start = int(valid[start])
+                valid = None
+            for batch_start in range(start, record_count, batch_size):
+                block = records[batch_start:batch_start + batch_size]
+                deleted = block[:, 0] == ord('*')
+                if deleted.any():
+                    block = block[~deleted]
+                yield pd.DataFrame({field.name: _decode_field(block, field, header.encoding) for field in fields})
+        finally:
+            # 关闭内存映射前先释放对它的引用
+            records = block = valid = None
@@ -0,0 +1,62 @@
+"""值域解码：每个字段预先构建一次 编码→描述 查找表，按批整列映射，不逐个单元格查字典"""
+
+import pandas as pd
+
+from .categorical import categorical_from_codes, is_low_cardinality
+
+
+class DomainLookup:
+    """单个字段的 编码→描述 查找表
+
+    编码在数据源中可能存为文本或数值（GeoPackage 的枚举值总是文本），
+    因此同时准备文本索引与数值索引，按列的 dtype 选用。未在值域中的值保持原样。
+    """
+
+    def __init__(self, domain):
+        text = pd.Series({str(code): description for code, description in domain.items()}, dtype=object)
+        self.text_codes = text.index
+        self.text_descriptions = text.to_numpy()
+        numeric = pd.to_numeric(pd.Series(list(domain), dtype=object), errors='coerce')
+        numeric = pd.Series(list(domain.values()), index=numeric.astype('float64'), dtype=object)
+        numeric = numeric[numeric.index.notna() & ~numeric.index.duplicated()]
+        self.numeric_codes = numeric.index
+        self.numeric_descriptions = numeric.to_numpy()
+
+    def decode(self, series):
+        """返回解码后的值（未匹配的值与空值保持原样）
+
+        分类列与低基数列只解码不重复的值，返回 Categorical；其余列返回 object 数组。
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series)
+            if not is_low_cardinality(len(uniques), len(series)):
+                return self._decode_values(series)
+        return categorical_from_codes(codes, self._decode_values(pd.Series(uniques)))
+
+    def _decode_values(self, series):
+        """逐值查表解码，返回 object 数组"""
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            positions = self.numeric_codes.get_indexer(series.astype('float64'))
+            descriptions = self.numeric_descriptions
+        else:
+            positions = self.text_codes.get_indexer(series.astype(str))
+            descriptions = self.text_descriptions
+        values = series.to_numpy(dtype=object, copy=True)
+        matched = positions >= 0
+        values[matched] = descriptions[positions[matched]]
+        return values
+
+
+def build_lookups(fields):
+    """按 schema.FieldInfo 列表为带值域的字段构建查找表，返回 {字段: DomainLookup}"""
+    return {field.name: DomainLookup(field.domain) for field in fields if field.domain}
+
+
+def decode_domains(df, lookups):
+    """将 df 中带值域的列替换为描述文本，返回新的 DataFrame（原 df 不变）"""
+    columns = [name for name in lookups if name in df.columns]
+    if not columns:
+        return df
+    return df.assign(**{name: pd.Series(lookups[name].decode(df[name]), index=df.index) for name in columns})
@@ -0,0 +1,110 @@
+"""字段选择：勾选状态、增量搜索与可保存的字段预设（不依赖界面）
+
+界面只把当前匹配搜索的字段放进 ttk.Treeview，Treeview 只绘制可见的行，
+几千个字段的图层也能立即打开；勾选状态保存在这里，不为每个字段创建 Tk 变量。
+"""
+
+import json
+import os
+
+from .perf import user_data_dir
+
+
+def default_presets_path():
+    """字段预设文件（{预设名: [字段, ...]}）"""
+    return os.path.join(user_data_dir(), 'field_presets.json')
+
+
+class FieldSelection:
+    """图层字段的勾选状态（按图层中的字段顺序）"""
+
+    def __init__(self, fields=()):
+        # fields 为 schema.FieldInfo 列表；几何字段不参与选择
+        self.names = [field.name for field in fields if field.name != 'geometry']
+        self.labels = {field.name: f"{field.name}（{field.alias}）" if field.alias else field.name
+                       for field in fields if field.name != 'geometry'}
+        self._search_keys = {name: label.lower() for name, label in self.labels.items()}
+        self.selected = set(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def matching(self, text=""):
+        """名称或别名包含 text（不区分大小写）的字段，text 为空时为全部字段"""
+        text = text.strip().lower()
+        if not text:
+            return list(self.names)
+        return [name for name in self.names if text in self._search_keys[name]]
+
+    def toggle(self, name):
+        """切换一个字段的勾选状态，返回切换后是否选中"""
+        if name in self.selected:
+            self.selected.discard(name)
+            return False
+        self.selected.add(name)
+        return True
+
+    def set_selected(self, names, value):
+        """勾选或取消勾选 names 中的字段"""
+        if value:
+            self.selected.update(name for name in names if name in self.labels)
+        else:
+            self.selected.difference_update(names)
+
+    def selected_fields(self):
+        """选中的字段（按图层中的顺序）"""
+        return [name for name in self.names if name in self.selected]
+
+    def apply_preset(self, fields):
+        """按预设勾选字段（预设中本图层没有的字段忽略），返回匹配到的字段数"""
+        self.selected = set(fields) & set(self.names)
+        return len(self.selected)
+
+
+class PresetStore:
+    """字段预设的读写；文件损坏或不存在时视为没有预设"""
+
+    def __init__(self, path=None):
+        self.path = path or default_presets_path()
+
+    def load(self):
+        """返回 {预设名: [字段, ...]}"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                presets = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(presets, dict):
+            return {}
+        return {str(name): list(fields) for name, fields in presets.items() if isinstance(fields, list)}
+
+    def names(self):
+        """全部预设名（按名称排序）"""
+        return sorted(self.load())
+
+    def get(self, name):
+        """读取一个预设的字段列表，不存在时返回 None"""
+        return self.load().get(name)
+
+    def save(self, name, fields):
+        """保存（或覆盖）一个预设"""
+        name = name.strip()
+        if not name:
+            raise Exception("预设名称不能为空")
+        presets = self.load()
+        presets[name] = list(fields)
+        self._write(presets)
+
+    def delete(self, name):
+        """删除一个预设（不存在时忽略）"""
+        presets = self.load()
+        if presets.pop(name, None) is not None:
+            self._write(presets)
+
+    def _write(self, presets):
+        """原子地写入预设文件"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(presets, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,123 @@
+"""几何派生列：按批用 shapely 2 的数组运算计算面积、长度、质心坐标与 WKT，可先投影到指定坐标系"""
+
+import collections
+
+import numpy as np
+
+# 读取器产出的几何列名（Arrow 为 WKB 字节串，pyogrio/fiona 为 shapely 几何）
+GEOMETRY_COLUMN = 'geometry'
+
+# 可导出的几何派生列：键 -> 导出的列名（沿用 ArcGIS 的 SHAPE_Area/SHAPE_Length 命名）
+GEOMETRY_COLUMNS = collections.OrderedDict([
+    ('area', 'SHAPE_Area'),
+    ('length', 'SHAPE_Length'),
+    ('centroid_x', 'CENTROID_X'),
+    ('centroid_y', 'CENTROID_Y'),
+    ('wkt', 'WKT'),
+])
+
+# WKT 坐标保留的小数位数
+WKT_PRECISION = 6
+
+# Excel 单元格最多容纳的字符数；XlsxWriter 不会写入更长的文本
+EXCEL_MAX_STRING = 32767
+
+
+def _require_shapely():
+    """导入 shapely 2（几何派生列依赖它的数组运算）"""
+    try:
+        import shapely
+    except ImportError:
+        raise Exception("计算几何列需要安装 shapely 2.0 或更高版本")
+    if not hasattr(shapely, 'from_wkb'):
+        raise Exception("计算几何列需要 shapely 2.0 或更高版本")
+    return shapely
+
+
+def parse_geometry_columns(text):
+    """解析逗号分隔的几何列名（如 "area,centroid_x"），返回按 GEOMETRY_COLUMNS 顺序排列的键列表"""
+    keys = [key.strip().lower() for key in text.replace('，', ',').split(',') if key.strip()]
+    unknown = [key for key in keys if key not in GEOMETRY_COLUMNS]
+    if unknown:
+        raise Exception(f"未知的几何列：{', '.join(unknown)}（可选 {', '.join(GEOMETRY_COLUMNS)}）")
+    return [key for key in GEOMETRY_COLUMNS if key in keys]
+
+
+def make_transformer(source_crs, target_crs):
+    """创建从图层坐标系到 target_crs（如 "EPSG:4547"）的坐标转换；target_crs 为空时返回 None"""
+    if not target_crs:
+        return None
+    if not source_crs:
+        raise Exception(f"图层没有坐标系，无法投影到 {target_crs}")
+    try:
+        import pyproj
+    except ImportError:
+        raise Exception("投影几何列需要安装 pyproj")
+    try:
+        return pyproj.Transformer.from_crs(source_crs, target_crs, always_xy=True)
+    except Exception as e:
+        raise Exception(f"无法从 {source_crs} 投影到 {target_crs}：{e}")
+
+
+def _as_geometries(values):
+    """把一列 WKB 字节串或 shapely 几何转换为 shapely 几何数组（空值为 None）"""
+    shapely = _require_shapely()
+    values = np.asarray(values, dtype=object)
+    # 同一读取引擎产出的几何类型一致，按第一个非空值判断
+    first = next((value for value in values if value is not None), None)
+    if isinstance(first, (bytes, bytearray)):
+        return shapely.from_wkb(values)
+    return values
+
+
+def derive_columns(values, keys, transformer=None):
+    """由一批几何计算派生列，返回 {导出列名: 数组}
+
+    values 为 WKB 字节串或 shapely 几何；transformer 为 make_transformer 的结果，
+    给出时先整批投影再计算（面积、长度的单位为目标坐标系的单位）。空几何的各列为空值。
+    """
+    shapely = _require_shapely()
+    geometries = _as_geometries(values)
+    if transformer is not None:
+        geometries = shapely.transform(geometries, transformer.transform, interleaved=False)
+    missing = shapely.is_missing(geometries) | shapely.is_empty(geometries)
+
+    columns = {}
+    if 'area' in keys:
+        columns[GEOMETRY_COLUMNS['area']] = np.where(missing, np.nan, shapely.area(geometries))
+    if 'length' in keys:
+        columns[GEOMETRY_COLUMNS['length']] = np.where(missing, np.nan, shapely.length(geometries))
+    if 'centroid_x' in keys or 'centroid_y' in keys:
+        centroids = shapely.centroid(geometries)
+        if 'centroid_x' in keys:
+            columns[GEOMETRY_COLUMNS['centroid_x']] = shapely.get_x(centroids)
+        if 'centroid_y' in keys:
+            columns[GEOMETRY_COLUMNS['centroid_y']] = shapely.get_y(centroids)
+    if 'wkt' in keys:
+        wkt = shapely.to_wkt(geometries, rounding_precision=WKT_PRECISION)
+        wkt[missing] = None
+        columns[GEOMETRY_COLUMNS['wkt']] = wkt
+    return columns
+
+
+def _limit_wkt(wkt, max_length):
+    """把超过 max_length 个字符的 WKT 原地替换为提示文本，返回替换的个数"""
+    too_long = [i for i, value in enumerate(wkt) if value is not None and len(value) > max_length]
+    for i in too_long:
+        wkt[i] = f"#WKT过长（{len(wkt[i])} 字符，超过单元格上限 {max_length}）"
+    return len(too_long)
+
+
+def add_geometry_columns(df, keys, transformer=None, max_wkt_length=None):
+    """为一批数据追加几何派生列并去掉原几何列，返回 (新的 DataFrame, 超长被替换的 WKT 数)（原 df 不变）
+
+    max_wkt_length 为单元格能容纳的字符数（XLSX 输出为 EXCEL_MAX_STRING），超过的 WKT 替换为提示文本；
+    为 None 时保留完整的 WKT（CSV、Parquet）。
+    """
+    if GEOMETRY_COLUMN not in df.columns:
+        raise Exception("数据中没有几何，无法计算几何列")
+    columns = derive_columns(df[GEOMETRY_COLUMN].to_numpy(dtype=object), keys, transformer)
+    too_long = 0
+    if max_wkt_length is not None and 'wkt' in keys:
+        too_long = _limit_wkt(columns[GEOMETRY_COLUMNS['wkt']], max_wkt_length)
+    return df.drop(columns=[GEOMETRY_COLUMN]).assign(**columns), too_long
@@ -0,0 +1,638 @@
+#程序要求：在窗口中选择gis图层文件，选择xlsx输出位置及名称，选择是否使用别名作为列名称，选择要导出的字段，选择导出的sheet名称，点击导出按钮将图层属性表导出为xlsx文件。
+#注意：属性表通常有几十万行，而且属性表中存在中文，需要注意内存问题、编码问题和效率问题，使用XlsxWriter包导出xlsx文件。
+
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import threading
+import os
+
+from .batch import export_batch, format_batch_summary
+from .cache import ExportCache
+from .checkpoint import CHECKPOINT_ROWS
+from .core import ExportCancelled, export_layer
+from .fieldlist import FieldSelection, PresetStore
+from .geometry import GEOMETRY_COLUMNS
+from .perf import ExportProfile
+from .reader import parse_bbox
+from .schema import read_schema
+from .writer import DEFAULT_STYLE
+
+# 导出样式下拉框的显示文本（writer.EXPORT_STYLES）
+STYLE_LABELS = {
+    'styled': "单元格带边框",
+    'balanced': "无边框（文件最小）",
+    'fast': "无边框、快速压缩（最快）",
+}
+
+# 几何派生列复选框的显示文本（geometry.GEOMETRY_COLUMNS）
+GEOMETRY_LABELS = {
+    'area': "面积",
+    'length': "长度/周长",
+    'centroid_x': "质心X",
+    'centroid_y': "质心Y",
+    'wkt': "WKT",
+}
+
+class GISExportApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Export to XLSX - y600")
+        self.root.geometry("800x600")
+        self.root.resizable(True, True)
+        
+        # 数据变量
+        self.schema = None
+        self._schema_request = 0
+        self.input_path = tk.StringVar()
+        self.output_path = tk.StringVar()
+        self.use_alias = tk.BooleanVar(value=True)
+        self.use_domain = tk.BooleanVar(value=True)
+        self.sheet_name = tk.StringVar(value="Sheet1")
+        self.max_rows_per_file = tk.StringVar(value="")
+        self.resumable = tk.BooleanVar(value=False)
+        self.use_cache = tk.BooleanVar(value=False)
+        self.style_label = tk.StringVar(value=STYLE_LABELS[DEFAULT_STYLE])
+        self.where = tk.StringVar(value="")
+        self.bbox = tk.StringVar(value="")
+        self.geometry_vars = {key: tk.BooleanVar(value=False) for key in GEOMETRY_COLUMNS}
+        self.crs = tk.StringVar(value="")
+        self.fields = FieldSelection()
+        self.field_search = tk.StringVar(value="")
+        self.preset_name = tk.StringVar(value="")
+        self.presets = PresetStore()
+        self._filter_job = None
+        self._cancel_event = None
+        
+        self.create_widgets()
+    
+    def create_widgets(self):
+        # 主框架
+        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # 配置权重
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(0, weight=1)
+        main_frame.columnconfigure(1, weight=1)
+        
+        # 输入图层选择
+        ttk.Label(main_frame, text="输入要素类/表格").grid(row=0, column=0, columnspan=2, sticky=tk.W, pady=(0, 5))
+        
+        input_frame = ttk.Frame(main_frame)
+        input_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        input_frame.columnconfigure(0, weight=1)
+        
+        self.input_entry = ttk.Entry(input_frame, textvariable=self.input_path)
+        self.input_entry.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
+        
+        input_btn = ttk.Button(input_frame, text="...", width=3, command=self.select_input_file)
+        input_btn.grid(row=0, column=1)
+        
+        # 输出文件选择
+        ttk.Label(main_frame, text="输出Excel文件").grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(0, 5))
+        
+        output_frame = ttk.Frame(main_frame)
+        output_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        output_frame.columnconfigure(0, weight=1)
+        
+        self.output_entry = ttk.Entry(output_frame, textvariable=self.output_path)
+        self.output_entry.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
+        
+        output_btn = ttk.Button(output_frame, text="...", width=3, command=self.select_output_file)
+        output_btn.grid(row=0, column=1)
+        
+        # 选项复选框
+        options_frame = ttk.Frame(main_frame)
+        options_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        
+        self.alias_check = ttk.Checkbutton(options_frame, text="使用字段别名作为列名称", 
+                                          variable=self.use_alias)
+        self.alias_check.grid(row=0, column=0, sticky=tk.W)
+
+        self.domain_check = ttk.Checkbutton(options_frame, text="使用域和子类型描述", 
+                                           variable=self.use_domain)
+        self.domain_check.grid(row=1, column=0, sticky=tk.W)
+        
+        self.resumable_check = ttk.Checkbutton(options_frame, text=f"断点续传（每 {CHECKPOINT_ROWS} 行保存一个分段文件，中断后可继续）",
+                                              variable=self.resumable)
+        self.resumable_check.grid(row=2, column=0, sticky=tk.W)
+        
+        self.cache_check = ttk.Checkbutton(options_frame, text="数据和选项未变化时直接使用上次的导出结果（缓存）",
+                                          variable=self.use_cache)
+        self.cache_check.grid(row=3, column=0, sticky=tk.W)
+        
+        # 由几何计算的列（追加在属性列之后），可先投影到指定坐标系
+        geometry_frame = ttk.Frame(options_frame)
+        geometry_frame.grid(row=4, column=0, sticky=tk.W)
+        ttk.Label(geometry_frame, text="追加几何列：").grid(row=0, column=0, sticky=tk.W)
+        for column, key in enumerate(GEOMETRY_COLUMNS, start=1):
+            ttk.Checkbutton(geometry_frame, text=GEOMETRY_LABELS[key],
+                            variable=self.geometry_vars[key]).grid(row=0, column=column, sticky=tk.W, padx=(0, 5))
+        ttk.Label(geometry_frame, text="投影到（可选，如 EPSG:4547）").grid(row=0, column=len(GEOMETRY_COLUMNS) + 1,
+                                                                     sticky=tk.W, padx=(10, 5))
+        ttk.Entry(geometry_frame, textvariable=self.crs, width=14).grid(row=0, column=len(GEOMETRY_COLUMNS) + 2,
+                                                                       sticky=tk.W)
+        
+        # 字段选择区域：标题与增量搜索
+        fields_header = ttk.Frame(main_frame)
+        fields_header.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 5))
+        fields_header.columnconfigure(2, weight=1)
+        ttk.Label(fields_header, text="选择字段").grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(fields_header, text="搜索").grid(row=0, column=1, sticky=tk.E, padx=(20, 5))
+        search_entry = ttk.Entry(fields_header, textvariable=self.field_search, width=30)
+        search_entry.grid(row=0, column=2, sticky=(tk.W, tk.E))
+        self.field_search.trace_add('write', lambda *args: self._schedule_field_filter())
+        
+        # 字段列表框架
+        fields_frame = ttk.Frame(main_frame)
+        fields_frame.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        fields_frame.columnconfigure(0, weight=1)
+        fields_frame.rowconfigure(0, weight=1)
+        
+        # 字段列表（带滚动条）：Treeview 只绘制可见的行，几千个字段也能立即显示；单击或空格切换勾选
+        list_frame = ttk.Frame(fields_frame)
+        list_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        list_frame.columnconfigure(0, weight=1)
+        list_frame.rowconfigure(0, weight=1)
+        
+        self.fields_tree = ttk.Treeview(list_frame, show='tree', selectmode='extended', height=10)
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.fields_tree.yview)
+        self.fields_tree.configure(yscrollcommand=scrollbar.set)
+        self.fields_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.fields_tree.bind("<ButtonRelease-1>", self._on_field_click)
+        self.fields_tree.bind("<space>", self._on_field_space)
+        
+        # 字段操作按钮（作用于当前搜索结果）与字段预设
+        btn_frame = ttk.Frame(fields_frame)
+        btn_frame.grid(row=1, column=0, pady=(5, 0))
+        
+        ttk.Button(btn_frame, text="全选", command=self.select_all_fields).grid(row=0, column=0, padx=(0, 5))
+        ttk.Button(btn_frame, text="取消全选", command=self.deselect_all_fields).grid(row=0, column=1, padx=(0, 5))
+        ttk.Label(btn_frame, text="预设").grid(row=0, column=2, padx=(20, 5))
+        self.preset_combo = ttk.Combobox(btn_frame, textvariable=self.preset_name, values=self.presets.names(),
+                                         width=20)
+        self.preset_combo.grid(row=0, column=3, padx=(0, 5))
+        self.preset_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_field_preset())
+        ttk.Button(btn_frame, text="保存预设", command=self.save_field_preset).grid(row=0, column=4, padx=(0, 5))
+        ttk.Button(btn_frame, text="删除预设", command=self.delete_field_preset).grid(row=0, column=5)
+
+        # Sheet名称
+        sheet_frame = ttk.Frame(main_frame)
+        sheet_frame.grid(row=7, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+
+        ttk.Label(sheet_frame, text="Sheet名称（可选）").grid(row=0, column=0, sticky=tk.W)
+        sheet_entry = ttk.Entry(sheet_frame, textvariable=self.sheet_name, width=30)
+        sheet_entry.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        
+        # 超过单表行数上限时自动分表；设置后按行数拆分为多个文件
+        ttk.Label(sheet_frame, text="单个文件最大行数（可选）").grid(row=0, column=1, sticky=tk.W, padx=(20, 0))
+        max_rows_entry = ttk.Entry(sheet_frame, textvariable=self.max_rows_per_file, width=20)
+        max_rows_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=(20, 0))
+        
+        # 不需要边框时可明显加快写入与压缩保存
+        ttk.Label(sheet_frame, text="导出样式").grid(row=0, column=2, sticky=tk.W, padx=(20, 0))
+        style_combo = ttk.Combobox(sheet_frame, textvariable=self.style_label, values=list(STYLE_LABELS.values()),
+                                   state="readonly", width=24)
+        style_combo.grid(row=1, column=2, sticky=(tk.W, tk.E), padx=(20, 0))
+        
+        # 筛选条件交给 OGR 驱动处理，只读取满足条件的要素
+        ttk.Label(sheet_frame, text="筛选条件 SQL WHERE（可选，中文字段名用双引号）").grid(row=2, column=0, sticky=tk.W, pady=(10, 0))
+        where_entry = ttk.Entry(sheet_frame, textvariable=self.where, width=30)
+        where_entry.grid(row=3, column=0, sticky=(tk.W, tk.E))
+        
+        ttk.Label(sheet_frame, text="范围 minx,miny,maxx,maxy（可选）").grid(row=2, column=1, columnspan=2, sticky=tk.W,
+                                                                         padx=(20, 0), pady=(10, 0))
+        bbox_entry = ttk.Entry(sheet_frame, textvariable=self.bbox, width=20)
+        bbox_entry.grid(row=3, column=1, sticky=(tk.W, tk.E), padx=(20, 0))
+        
+        # 底部按钮
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=8, column=0, columnspan=2, pady=(20, 0))
+        
+        ttk.Button(button_frame, text="确定", command=self.export_data).grid(row=0, column=0, padx=(0, 10))
+        ttk.Button(button_frame, text="批量导出...", command=self.open_batch_dialog).grid(row=0, column=1, padx=(0, 10))
+        ttk.Button(button_frame, text="取消", command=self.cancel).grid(row=0, column=2)
+        
+        # 状态标签
+        self.status_label = ttk.Label(main_frame, text="请选择输入文件")
+        self.status_label.grid(row=9, column=0, columnspan=2, pady=(20, 0))
+        
+        # 配置主框架的行权重
+        main_frame.rowconfigure(6, weight=1)
+    
+    def cancel(self):
+        """取消：正在导出时请求停止导出，否则退出程序"""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self.status_label.config(text="正在取消...")
+        else:
+            self.root.quit()
+    
+    def _schedule_field_filter(self):
+        """搜索框输入时延迟刷新字段列表，连续输入只刷新一次"""
+        if self._filter_job is not None:
+            self.root.after_cancel(self._filter_job)
+        self._filter_job = self.root.after(150, self._refresh_field_list)
+    
+    def _field_text(self, name):
+        """字段列表中一行的文本：勾选标记加字段名（别名）"""
+        mark = "☑" if name in self.fields.selected else "☐"
+        return f"{mark} {self.fields.labels[name]}"
+    
+    def _refresh_field_list(self):
+        """按搜索条件重建字段列表（只插入匹配的字段）"""
+        self._filter_job = None
+        tree = self.fields_tree
+        tree.delete(*tree.get_children())
+        for name in self.fields.matching(self.field_search.get()):
+            tree.insert('', 'end', iid=name, text=self._field_text(name))
+    
+    def _update_field_rows(self, names):
+        """刷新已显示字段的勾选标记"""
+        for name in names:
+            if self.fields_tree.exists(name):
+                self.fields_tree.item(name, text=self._field_text(name))
+    
+    def _on_field_click(self, event):
+        """单击字段行切换勾选（按住 Shift/Ctrl 多选时只改变选中行，不切换）"""
+        if event.state & 0x0005:
+            return
+        name = self.fields_tree.identify_row(event.y)
+        if name:
+            self.fields.toggle(name)
+            self._update_field_rows([name])
+    
+    def _on_field_space(self, event):
+        """空格键切换选中行的勾选：有未勾选的行时全部勾选，否则全部取消"""
+        names = self.fields_tree.selection()
+        if names:
+            value = any(name not in self.fields.selected for name in names)
+            self.fields.set_selected(names, value)
+            self._update_field_rows(names)
+        return "break"
+    
+    def select_input_file(self):
+        """选择输入GIS文件"""
+        filetypes = [
+            ("所有支持格式", "*.shp;*.gpkg;*.geojson;*.kml"),
+            ("Shapefile", "*.shp"),
+            ("GeoPackage", "*.gpkg"),
+            ("GeoJSON", "*.geojson"),
+            ("KML", "*.kml"),
+            ("所有文件", "*.*")
+        ]
+        
+        filename = filedialog.askopenfilename(
+            title="选择GIS图层文件",
+            filetypes=filetypes
+        )
+        
+        if filename:
+            self.input_path.set(filename)
+            self.load_layer_fields()
+    
+    def select_output_file(self):
+        """选择输出Excel文件"""
+        filename = filedialog.asksaveasfilename(
+            title="保存Excel文件",
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("CSV (UTF-8)", "*.csv"), ("Parquet", "*.parquet"),
+                       ("所有文件", "*.*")]
+        )
+        
+        if filename:
+            self.output_path.set(filename)
+    
+    def load_layer_fields(self):
+        """在后台线程探测图层结构，完成后在界面线程中加载字段"""
+        self.status_label.config(text="正在读取文件结构...")
+        self._schema_request += 1
+        request = self._schema_request
+        input_file = self.input_path.get()
+        
+        def worker():
+            try:
+                schema = read_schema(input_file)
+            except Exception as e:
+                error = str(e)
+                self.root.after(0, lambda: self._on_schema_failed(request, error))
+            else:
+                self.root.after(0, lambda: self._on_schema_loaded(request, schema))
+        
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+    
+    def _on_schema_failed(self, request, error):
+        """结构探测失败（界面线程）"""
+        if request != self._schema_request:
+            return
+        messagebox.showerror("错误", f"加载图层失败：{error}")
+        self.status_label.config(text="加载图层失败")
+    
+    def _on_schema_loaded(self, request, schema):
+        """结构探测完成后加载字段列表（界面线程）"""
+        # 期间又选择了其他文件时忽略过期的结果
+        if request != self._schema_request:
+            return
+        self.schema = schema
+        self.fields = FieldSelection(schema.fields)
+        self._refresh_field_list()
+        
+        if schema.feature_count is not None:
+            self.status_label.config(
+                text=f"已加载图层，共 {len(self.fields)} 个字段，{schema.feature_count} 条要素")
+        else:
+            self.status_label.config(text=f"已加载图层，共 {len(self.fields)} 个字段")
+    
+    def select_all_fields(self):
+        """勾选当前搜索结果中的全部字段"""
+        names = self.fields.matching(self.field_search.get())
+        self.fields.set_selected(names, True)
+        self._update_field_rows(names)
+    
+    def deselect_all_fields(self):
+        """取消勾选当前搜索结果中的全部字段"""
+        names = self.fields.matching(self.field_search.get())
+        self.fields.set_selected(names, False)
+        self._update_field_rows(names)
+    
+    def get_selected_fields(self):
+        """获取选中的字段"""
+        return self.fields.selected_fields()
+    
+    def apply_field_preset(self):
+        """按下拉框中选择的预设勾选字段"""
+        fields = self.presets.get(self.preset_name.get())
+        if fields is None:
+            return
+        matched = self.fields.apply_preset(fields)
+        self._update_field_rows(self.fields.names)
+        self.status_label.config(text=f"已应用预设，勾选 {matched}/{len(fields)} 个字段")
+    
+    def save_field_preset(self):
+        """把当前勾选的字段保存为预设（名称取下拉框中输入的文本，同名时覆盖）"""
+        name = self.preset_name.get().strip()
+        if not name:
+            messagebox.showwarning("警告", "请在预设框中输入预设名称")
+            return
+        selected_fields = self.get_selected_fields()
+        if not selected_fields:
+            messagebox.showwarning("警告", "请至少选择一个字段")
+            return
+        try:
+            self.presets.save(name, selected_fields)
+        except Exception as e:
+            messagebox.showerror("错误", f"保存预设失败：{e}")
+            return
+        self.preset_combo.configure(values=self.presets.names())
+        self.status_label.config(text=f"已保存预设“{name}”（{len(selected_fields)} 个字段）")
+    
+    def delete_field_preset(self):
+        """删除下拉框中的预设"""
+        name = self.preset_name.get().strip()
+        if not name or self.presets.get(name) is None:
+            return
+        try:
+            self.presets.delete(name)
+        except OSError as e:
+            messagebox.showerror("错误", f"删除预设失败：{e}")
+            return
+        self.preset_name.set("")
+        self.preset_combo.configure(values=self.presets.names())
+    
+    def _selected_style(self):
+        """下拉框中选择的导出样式"""
+        label = self.style_label.get()
+        return next((style for style, text in STYLE_LABELS.items() if text == label), DEFAULT_STYLE)
+    
+    def export_data(self):
+        """导出数据到Excel"""
+        if self._cancel_event is not None:
+            messagebox.showwarning("警告", "正在导出，请等待完成或点击取消")
+            return
+        
+        if not self.input_path.get():
+            messagebox.showwarning("警告", "请选择输入文件")
+            return
+        
+        if not self.output_path.get():
+            messagebox.showwarning("警告", "请选择输出文件")
+            return
+        
+        selected_fields = self.get_selected_fields()
+        if not selected_fields:
+            messagebox.showwarning("警告", "请至少选择一个字段")
+            return
+        
+        # 检查输出目录是否存在
+        output_dir = os.path.dirname(self.output_path.get())
+        if not os.path.exists(output_dir):
+            messagebox.showerror("错误", "输出目录不存在")
+            return
+        
+        max_rows_per_file = self._max_rows_per_file()
+        if max_rows_per_file is False:
+            return
+        filters = self._filters()
+        if filters is False:
+            return
+        options = dict(filters, **self._geometry_options())
+        
+        # 在新线程中执行导出，避免界面卡顿；“取消”按钮通过事件通知导出停止
+        self._cancel_event = threading.Event()
+        thread = threading.Thread(target=self._export_worker,
+                                  args=(selected_fields, max_rows_per_file, self._cancel_event, options))
+        thread.daemon = True
+        thread.start()
+    
+    def _post_status(self, text):
+        """从工作线程更新状态标签"""
+        self.root.after(0, lambda: self.status_label.config(text=text))
+    
+    def _post_progress(self, done, total):
+        """从工作线程更新导出进度"""
+        if total:
+            self._post_status(f"正在导出... {done}/{total} 行")
+        else:
+            self._post_status(f"正在导出... {done} 行")
+    
+    def _max_rows_per_file(self):
+        """读取“单个文件最大行数”，未填写返回 None，无效时返回 False"""
+        max_rows_text = self.max_rows_per_file.get().strip()
+        if not max_rows_text:
+            return None
+        if not max_rows_text.isdigit() or int(max_rows_text) <= 0:
+            messagebox.showwarning("警告", "单个文件最大行数必须为正整数")
+            return False
+        return int(max_rows_text)
+    
+    def _filters(self, parent=None):
+        """读取筛选条件，返回传给 export_layer 的 where/bbox，范围无效时返回 False"""
+        bbox = None
+        if self.bbox.get().strip():
+            try:
+                bbox = parse_bbox(self.bbox.get())
+            except Exception as e:
+                messagebox.showwarning("警告", str(e), parent=parent)
+                return False
+        return {'where': self.where.get().strip() or None, 'bbox': bbox}
+    
+    def _geometry_options(self):
+        """勾选的几何派生列与投影坐标系，返回传给 export_layer 的 geometry_columns/crs"""
+        keys = [key for key, var in self.geometry_vars.items() if var.get()]
+        return {'geometry_columns': keys or None, 'crs': self.crs.get().strip() or None}
+    
+    def _export_worker(self, selected_fields, max_rows_per_file=None, cancel_event=None, options=None):
+        """导出工作线程；options 为筛选条件等其余传给 export_layer 的参数"""
+        try:
+            # 更新UI状态
+            self.root.after(0, lambda: self.status_label.config(text="正在读取数据..."))
+            
+            profile = ExportProfile()
+            output_paths = export_layer(
+                self.input_path.get(),
+                self.output_path.get(),
+                selected_fields,
+                sheet_name=self.sheet_name.get(),
+                max_rows_per_file=max_rows_per_file,
+                use_alias=self.use_alias.get(),
+                use_domain=self.use_domain.get(),
+                style=self._selected_style(),
+                progress=self._post_progress,
+                status=self._post_status,
+                profile=profile,
+                cancel_event=cancel_event,
+                checkpoint_rows=CHECKPOINT_ROWS if self.resumable.get() else None,
+                cache=ExportCache() if self.use_cache.get() else None,
+                **(options or {})
+            )
+            
+            # 性能记录追加到用户目录下的日志，便于比较多次运行
+            try:
+                profile.append_log()
+            except OSError:
+                pass
+            
+            # 完成
+            self.root.after(0, lambda: self.status_label.config(text="导出完成！"))
+            if len(output_paths) > 1:
+                message = f"数据已拆分导出为 {len(output_paths)} 个文件：\n" + "\n".join(output_paths)
+            else:
+                message = f"数据已导出到：\n{self.output_path.get()}"
+            message += "\n\n" + profile.summary()
+            self.root.after(0, lambda: messagebox.showinfo("成功", message))
+            
+        except ExportCancelled:
+            self.root.after(0, lambda: self.status_label.config(text="导出已取消"))
+            if self.resumable.get():
+                self.root.after(0, lambda: messagebox.showinfo("已取消", "已完成的分段已保存，再次点击确定将从中断处继续导出"))
+        except Exception as e:
+            self.root.after(0, lambda: self.status_label.config(text="导出失败"))
+            self.root.after(0, lambda: messagebox.showerror("错误", f"导出失败：{str(e)}"))
+            # 记录详细错误信息到状态标签（可选）
+            # self.root.after(0, lambda: self.status_label.config(text=f"导出失败: {str(e)[:50]}..."))
+        finally:
+            self._cancel_event = None
+    
+    def open_batch_dialog(self):
+        """批量导出对话框：选择文件夹、通配符或 GeoPackage，并行导出每个图层"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("批量导出")
+        dialog.transient(self.root)
+        dialog.columnconfigure(0, weight=1)
+        
+        source = tk.StringVar()
+        output_dir = tk.StringVar()
+        workers = tk.StringVar(value=str(os.cpu_count() or 1))
+        
+        frame = ttk.Frame(dialog, padding="10")
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        frame.columnconfigure(0, weight=1)
+        
+        ttk.Label(frame, text="输入文件夹 / 通配符 / GeoPackage").grid(row=0, column=0, columnspan=3, sticky=tk.W, pady=(0, 5))
+        ttk.Entry(frame, textvariable=source, width=60).grid(row=1, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
+        ttk.Button(frame, text="文件夹", width=6,
+                   command=lambda: source.set(filedialog.askdirectory(parent=dialog) or source.get())).grid(row=1, column=1, padx=(0, 5))
+        ttk.Button(frame, text="GPKG", width=6,
+                   command=lambda: source.set(filedialog.askopenfilename(
+                       parent=dialog, filetypes=[("GeoPackage", "*.gpkg")]) or source.get())).grid(row=1, column=2)
+        
+        ttk.Label(frame, text="输出文件夹").grid(row=2, column=0, columnspan=3, sticky=tk.W, pady=(10, 5))
+        ttk.Entry(frame, textvariable=output_dir).grid(row=3, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
+        ttk.Button(frame, text="...", width=3,
+                   command=lambda: output_dir.set(filedialog.askdirectory(parent=dialog) or output_dir.get())).grid(row=3, column=1)
+        
+        ttk.Label(frame, text="并行进程数").grid(row=4, column=0, columnspan=3, sticky=tk.W, pady=(10, 5))
+        ttk.Spinbox(frame, from_=1, to=64, textvariable=workers, width=8).grid(row=5, column=0, sticky=tk.W)
+        
+        def start():
+            if not source.get():
+                messagebox.showwarning("警告", "请选择输入", parent=dialog)
+                return
+            if not os.path.isdir(output_dir.get()):
+                messagebox.showerror("错误", "输出目录不存在", parent=dialog)
+                return
+            if not workers.get().isdigit() or int(workers.get()) <= 0:
+                messagebox.showwarning("警告", "并行进程数必须为正整数", parent=dialog)
+                return
+            max_rows_per_file = self._max_rows_per_file()
+            if max_rows_per_file is False:
+                return
+            filters = self._filters(dialog)
+            if filters is False:
+                return
+            
+            options = {
+                'sheet_name': self.sheet_name.get(),
+                'max_rows_per_file': max_rows_per_file,
+                'use_alias': self.use_alias.get(),
+                'use_domain': self.use_domain.get(),
+                'style': self._selected_style(),
+                'cache': ExportCache() if self.use_cache.get() else None,
+                **filters,
+                **self._geometry_options(),
+            }
+            thread = threading.Thread(
+                target=self._batch_worker,
+                args=(source.get(), output_dir.get(), int(workers.get()), options)
+            )
+            thread.daemon = True
+            thread.start()
+            dialog.destroy()
+        
+        button_frame = ttk.Frame(frame)
+        button_frame.grid(row=6, column=0, columnspan=3, pady=(20, 0))
+        ttk.Button(button_frame, text="开始", command=start).grid(row=0, column=0, padx=(0, 10))
+        ttk.Button(button_frame, text="取消", command=dialog.destroy).grid(row=0, column=1)
+    
+    def _batch_worker(self, source, output_dir, workers, options):
+        """批量导出工作线程，逐个图层显示进度，结束后显示汇总"""
+        try:
+            self._post_status("正在查找图层...")
+            
+            def on_layer_done(done, total, result):
+                name = os.path.basename(result.input_file)
+                if result.layer is not None:
+                    name = f"{name}:{result.layer}"
+                state = "失败" if result.error else "完成"
+                self._post_status(f"批量导出 {done}/{total}：{name} {state}")
+            
+            results = export_batch(source, output_dir, workers=workers, progress=on_layer_done, **options)
+            summary = format_batch_summary(results)
+            
+            self._post_status("批量导出完成！")
+            if any(result.error for result in results):
+                self.root.after(0, lambda: messagebox.showwarning("批量导出完成", summary))
+            else:
+                self.root.after(0, lambda: messagebox.showinfo("批量导出完成", summary))
+        except Exception as e:
+            self.root.after(0, lambda: self.status_label.config(text="批量导出失败"))
+            self.root.after(0, lambda: messagebox.showerror("错误", f"批量导出失败：{str(e)}"))
+
+def export_to_xlsx():
+    """主函数入口"""
+    root = tk.Tk()
+    app = GISExportApp(root)
+    root.mainloop()
@@ -0,0 +1,201 @@
+"""性能测量：进程内存（常驻内存 RSS 与峰值，不依赖 psutil）与导出各阶段的耗时记录"""
+
+import collections
+import contextlib
+import datetime
+import json
+import os
+import sys
+import time
+
+
+def _windows_memory():
+    """通过 GetProcessMemoryInfo 读取工作集大小与峰值"""
+    import ctypes
+    from ctypes import wintypes
+    
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+    
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    if not kernel32.K32GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        return None, None
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+
+def _linux_memory():
+    """从 /proc/self/status 读取 VmRSS 与 VmHWM"""
+    rss = peak = None
+    with open('/proc/self/status', 'rb') as f:
+        for line in f:
+            if line.startswith(b'VmRSS:'):
+                rss = int(line.split()[1]) * 1024
+            elif line.startswith(b'VmHWM:'):
+                peak = int(line.split()[1]) * 1024
+    return rss, peak
+
+
+def memory_usage():
+    """返回当前进程的 (常驻内存, 峰值常驻内存) 字节数，无法获取的项为 None"""
+    try:
+        if sys.platform == 'win32':
+            return _windows_memory()
+        if os.path.exists('/proc/self/status'):
+            return _linux_memory()
+        import resource
+        
+        # macOS 上 ru_maxrss 单位为字节
+        return None, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        return None, None
+
+
+def current_rss():
+    """当前进程的常驻内存字节数，无法获取时为 None"""
+    return memory_usage()[0]
+
+
+# 导出阶段及其显示名称（按流程顺序）
+PHASE_LABELS = collections.OrderedDict([
+    ('read', "读取"),
+    ('wait', "等待读取"),
+    ('select', "选列"),
+    ('decode', "值域解码"),
+    ('geometry', "几何计算"),
+    ('convert', "转换"),
+    ('write', "写入"),
+    ('close', "压缩保存"),
+])
+
+
+def null_phase(name, rows=0):
+    """不记录任何内容的阶段计时，未启用性能记录时使用"""
+    return contextlib.nullcontext()
+
+
+class ExportProfile:
+    """记录一次导出中各阶段的累计耗时、行数与阶段结束时的最大常驻内存"""
+    
+    def __init__(self):
+        self.started_at = datetime.datetime.now()
+        self.info = {}
+        self.phases = collections.OrderedDict(
+            (name, {'seconds': 0.0, 'rows': 0, 'calls': 0, 'rss': None}) for name in PHASE_LABELS
+        )
+        self._start = time.perf_counter()
+        self._end = None
+    
+    @contextlib.contextmanager
+    def phase(self, name, rows=0):
+        """对 with 语句块计时并累加到指定阶段"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = self.phases.setdefault(name, {'seconds': 0.0, 'rows': 0, 'calls': 0, 'rss': None})
+            record['seconds'] += time.perf_counter() - start
+            record['rows'] += rows
+            record['calls'] += 1
+            rss = current_rss()
+            if rss is not None and (record['rss'] is None or rss > record['rss']):
+                record['rss'] = rss
+    
+    def add_rows(self, name, rows):
+        """为阶段补记行数（行数在计时结束后才知道时使用）"""
+        self.phases[name]['rows'] += rows
+    
+    def finish(self, **info):
+        """结束计时并补充导出信息（输入、输出、行数等）"""
+        self._end = time.perf_counter()
+        self.info.update(info)
+    
+    @property
+    def total_seconds(self):
+        return (self._end or time.perf_counter()) - self._start
+    
+    def report(self):
+        """生成可写入 JSON 的报告字典"""
+        total = self.total_seconds
+        rows = self.info.get('rows')
+        peak = memory_usage()[1]
+        phases = []
+        for name, record in self.phases.items():
+            if not record['calls']:
+                continue
+            phases.append({
+                'name': name,
+                'seconds': round(record['seconds'], 4),
+                'share': round(record['seconds'] / total, 4) if total else None,
+                'rows': record['rows'],
+                'rows_per_second': round(record['rows'] / record['seconds'], 1) if record['rows'] and record['seconds'] else None,
+                'rss_mb': round(record['rss'] / 1048576, 1) if record['rss'] is not None else None,
+            })
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total_seconds': round(total, 4),
+            'rows_per_second': round(rows / total, 1) if rows and total else None,
+            'peak_rss_mb': round(peak / 1048576, 1) if peak is not None else None,
+            **self.info,
+            'phases': phases,
+        }
+    
+    def summary(self):
+        """生成多行的中文性能摘要"""
+        report = self.report()
+        head = f"用时 {report['total_seconds']:.1f} 秒"
+        if report.get('rows') is not None:
+            head = f"共 {report['rows']} 行，" + head
+        if report['rows_per_second']:
+            head += f"（{report['rows_per_second']:.0f} 行/秒）"
+        if report['peak_rss_mb'] is not None:
+            head += f"，峰值内存 {report['peak_rss_mb']:.0f} MB"
+        lines = [head]
+        for phase in report['phases']:
+            line = f"  {PHASE_LABELS.get(phase['name'], phase['name'])}：{phase['seconds']:.2f} 秒"
+            if phase['share'] is not None:
+                line += f"（{phase['share']:.0%}）"
+            if phase['rows_per_second']:
+                line += f"，{phase['rows_per_second']:.0f} 行/秒"
+            lines.append(line)
+        return "\n".join(lines)
+    
+    def write_json(self, path):
+        """将报告写入 JSON 文件（如输出文件旁的 .perf.json）"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path
+    
+    def append_log(self, path=None):
+        """将报告作为一行 JSON 追加到日志文件，便于比较多次运行"""
+        path = path or default_log_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.report(), ensure_ascii=False) + "\n")
+        return path
+
+
+def user_data_dir():
+    """本程序的用户数据目录：Windows 下为 %LOCALAPPDATA%\\Export2XLSX，其它系统为 ~/.export2xlsx"""
+    base = os.environ.get('LOCALAPPDATA')
+    if sys.platform == 'win32' and base:
+        return os.path.join(base, 'Export2XLSX')
+    return os.path.join(os.path.expanduser('~'), '.export2xlsx')
+
+
+def default_log_path():
+    """默认的性能日志文件（每次导出追加一行 JSON）"""
+    return os.path.join(user_data_dir(), 'perf.jsonl')
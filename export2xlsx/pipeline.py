@@ -0,0 +1,101 @@
+"""读写流水线：后台线程预读批次，经有界队列交给写入线程，使读取与写入的耗时相互重叠"""
+
+import queue
+import threading
+
+from .perf import null_phase
+
+# 预读队列容量（批）：读取最多领先写入这么多批，内存占用以此为上限
+PREFETCH_BATCHES = 2
+
+# 队列等待的轮询间隔（秒），用于及时响应停止请求
+_POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+
+class _Failure:
+    """读取线程中发生的异常，交给写入线程重新抛出"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+class Prefetcher:
+    """在后台线程中调用 open_iterable() 创建迭代器并逐个读取，经有界队列依次交给写入线程
+
+    数据源在读取线程中打开、读取和关闭（fiona 等库的 GDAL 环境按线程保存，不能跨线程使用）。
+    创建后立即开始预读；队列满时读取线程阻塞等待（背压），因此最多有 maxsize 批在途。
+    读取线程中的异常在 next() 处重新抛出。close()（写入出错或结束时）或 cancel_event
+    被置位时，读取线程在当前批读完后停止，并关闭底层迭代器；此时迭代提前结束，
+    调用方需再检查 cancel_event，区分取消与数据读完。
+    phase 为阶段计时（perf.ExportProfile.phase），读取计入 read，写入线程等待计入 wait。
+    """
+
+    def __init__(self, open_iterable, maxsize=PREFETCH_BATCHES, phase=null_phase, cancel_event=None):
+        self._open_iterable = open_iterable
+        self._phase = phase
+        self._cancel_event = cancel_event
+        self._items = queue.Queue(maxsize)
+        self._stop = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(target=self._produce, name="export2xlsx-reader", daemon=True)
+        self._thread.start()
+
+    def _stopped(self):
+        return self._stop.is_set() or (self._cancel_event is not None and self._cancel_event.is_set())
+
+    def _put(self, item):
+        while not self._stopped():
+            try:
+                self._items.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        iterator = None
+        try:
+            iterator = iter(self._open_iterable())
+            while not self._stopped():
+                with self._phase('read'):
+                    item = next(iterator, _DONE)
+                if not self._put(item) or item is _DONE:
+                    return
+        except Exception as e:
+            self._put(_Failure(e))
+        finally:
+            # 在读取线程中关闭底层迭代器（释放文件句柄、内存映射等）
+            self._open_iterable = None
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self._finished:
+            with self._phase('wait'):
+                try:
+                    item = self._items.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    # 读取线程因取消而退出时不会再有数据
+                    if not self._thread.is_alive() and self._items.empty():
+                        self._finished = True
+                    continue
+            if item is _DONE:
+                self._finished = True
+            elif isinstance(item, _Failure):
+                self._finished = True
+                raise item.error
+            else:
+                return item
+        raise StopIteration
+
+    def close(self):
+        """停止读取线程并等待其退出"""
+        self._finished = True
+        self._stop.set()
+        self._thread.join()
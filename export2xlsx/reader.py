@@ -0,0 +1,338 @@
+"""属性表读取：按列投影、不解码几何，按批流式读取"""
+
+import itertools
+import os
+
+import pandas as pd
+
+from .categorical import is_low_cardinality
+from .dbf import iter_dbf_batches
+from .geometry import GEOMETRY_COLUMN
+
+# 流式读取时每批的最大行数
+READ_BATCH_SIZE = 10000
+
+
+# 可选的读取引擎；auto 按可用依赖自动选择并在失败时依次回退
+# dbf 为不经过 GDAL 的 Shapefile 属性表读取器，仅用于 .shp
+READ_ENGINES = ('auto', 'dbf', 'arrow', 'pyogrio', 'fiona')
+
+
+def _has_module(name):
+    """检查可选依赖是否可用"""
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+def _shapefile_dbf(input_file):
+    """Shapefile 对应的 .dbf 路径；不是 Shapefile 或 .dbf 不存在时返回 None"""
+    if not input_file.lower().endswith('.shp'):
+        return None
+    dbf_file = input_file[:-4] + '.dbf'
+    return dbf_file if os.path.exists(dbf_file) else None
+
+
+def _default_engine(input_file=None, needs_ogr=False):
+    """按数据格式与已安装的依赖选择最快的读取引擎
+
+    needs_ogr 为 True（有筛选条件或需要读取几何）时不使用只读取属性表的 dbf 引擎。
+    """
+    if input_file and not needs_ogr and _shapefile_dbf(input_file):
+        return 'dbf'
+    if _has_module('pyogrio'):
+        return 'arrow' if _has_module('pyarrow') else 'pyogrio'
+    return 'fiona'
+
+
+def parse_bbox(text):
+    """解析 "minx,miny,maxx,maxy" 格式的范围，返回 4 个浮点数的元组"""
+    try:
+        bbox = tuple(float(value) for value in text.replace('，', ',').split(','))
+    except ValueError:
+        bbox = ()
+    if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+        raise Exception("范围格式应为 minx,miny,maxx,maxy")
+    return bbox
+
+
+def read_mask(source, layer=None):
+    """读取空间筛选的范围几何：source 为面图层文件（全部要素合并为一个几何）或 WKT 文本"""
+    import shapely
+    
+    if not os.path.exists(source):
+        try:
+            return shapely.from_wkt(source)
+        except Exception:
+            raise Exception(f"范围既不是存在的文件也不是有效的 WKT：{source}")
+    import pyogrio
+    
+    geometry = pyogrio.raw.read(source, layer=layer, columns=[])[2]
+    if geometry is None or not len(geometry):
+        raise Exception(f"范围图层中没有几何：{source}")
+    return shapely.union_all(shapely.from_wkb(geometry))
+
+
+def _filter_kwargs(where=None, bbox=None, mask=None):
+    """传给 OGR 驱动的筛选参数（只包含设置了的项）"""
+    kwargs = {}
+    if where:
+        kwargs['where'] = where
+    if bbox is not None:
+        kwargs['bbox'] = tuple(bbox)
+    if mask is not None:
+        kwargs['mask'] = mask
+    return kwargs
+
+
+def _arrow_batch_to_frame(batch, geometry_name=None, keep_geometry=False):
+    """RecordBatch（或 Table）转为 DataFrame；低基数的文本列先做字典编码，转换后为分类列
+
+    geometry_name 为几何（WKB）列名：keep_geometry 为 True 时改名为 GEOMETRY_COLUMN 保留，否则不转换。
+    """
+    import pyarrow as pa
+    
+    if geometry_name is not None and geometry_name in batch.schema.names:
+        if keep_geometry:
+            batch = batch.rename_columns([GEOMETRY_COLUMN if name == geometry_name else name
+                                          for name in batch.schema.names])
+        else:
+            batch = batch.drop_columns([geometry_name])
+    columns = list(batch.columns)
+    encoded = False
+    for i, column in enumerate(columns):
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            dictionary = column.dictionary_encode()
+            if is_low_cardinality(len(dictionary.dictionary), len(column)):
+                columns[i] = dictionary
+                encoded = True
+    if encoded:
+        batch = pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+    return batch.to_pandas()
+
+
+def _fiona_frame(rows, columns, date_fields):
+    """由 fiona 逐要素读取的行构建 DataFrame；fiona 把日期字段读为 ISO 文本，与其他引擎一致转换为 datetime64"""
+    df = pd.DataFrame(rows, columns=columns)
+    for field in date_fields:
+        df[field] = pd.to_datetime(df[field], format='ISO8601', errors='coerce')
+    return df
+
+
+def _iter_attribute_batches(input_file, fields=None, layer=None, batch_size=READ_BATCH_SIZE, engine='arrow', start=0,
+                            where=None, bbox=None, mask=None, geometry=False):
+    """按批读取选中的属性列（不解码几何），逐批产出 DataFrame
+
+    fields 为 None 时读取全部属性列；start 为跳过的要素数（断点续传时使用，按筛选后的要素计）。
+    where（SQL WHERE 条件）、bbox（minx, miny, maxx, maxy）与 mask（shapely 几何）交给 OGR 驱动筛选，
+    可利用数据源的属性与空间索引，筛掉的要素不会被解码；范围应与图层使用相同的坐标系。
+    where 使用 OGR SQL 语法，字段名含中文等非 ASCII 字符时需用双引号括起，如 "行政区" = '城关区'。
+    geometry 为 True 时同时读取几何，放在 GEOMETRY_COLUMN 列（Arrow 为 WKB 字节串，其他引擎为 shapely 几何），
+    用于计算几何派生列（见 geometry.py）。
+    至少产出一批（可能为空），以便调用方获得实际存在的列。
+    """
+    filters = _filter_kwargs(where, bbox, mask)
+    if engine == 'dbf':
+        if filters:
+            raise Exception("dbf 引擎不支持筛选条件，请使用 arrow、pyogrio 或 fiona 引擎")
+        if geometry:
+            raise Exception("dbf 引擎不读取几何，请使用 arrow、pyogrio 或 fiona 引擎")
+        dbf_file = _shapefile_dbf(input_file)
+        if dbf_file is None:
+            raise Exception("dbf 引擎只支持带 .dbf 的 Shapefile")
+        yield from iter_dbf_batches(dbf_file, fields, batch_size, start)
+    
+    elif engine == 'arrow':
+        import pyogrio
+        
+        # Arrow 流式读取：数据源按批返回 RecordBatch
+        # 不读取几何时 OGR 的 Arrow 流无法正确按范围筛选（Shapefile 返回空，mask 只比较外包矩形），
+        # 因此有空间筛选时读取几何（WKB，不解码），转换前丢弃
+        read_geometry = geometry or bbox is not None or mask is not None
+        # 有空间筛选时 skip_features 按驱动粗筛（外包矩形）后的要素计数，GeoPackage 的 mask 会跳过错误的行数，
+        # 因此改为读取后跳过
+        skip = start if bbox is not None or mask is not None else 0
+        with pyogrio.open_arrow(input_file, layer=layer, columns=fields, read_geometry=read_geometry,
+                                skip_features=start - skip, batch_size=batch_size, use_pyarrow=True,
+                                **filters) as (meta, reader):
+            geometry_name = (meta.get('geometry_name') or 'wkb_geometry') if read_geometry else None
+            empty = True
+            for batch in reader:
+                if skip:
+                    dropped = min(skip, batch.num_rows)
+                    batch = batch.slice(dropped)
+                    skip -= dropped
+                    if not batch.num_rows:
+                        continue
+                empty = False
+                yield _arrow_batch_to_frame(batch, geometry_name, geometry)
+            if empty:
+                yield _arrow_batch_to_frame(reader.schema.empty_table(), geometry_name, geometry)
+    
+    elif engine == 'pyogrio':
+        import pyogrio
+        
+        if bbox is not None or mask is not None:
+            # 有空间筛选时 skip/max 分段会错位（同上，skip_features 按粗筛后的要素计数），
+            # 先读出满足条件的要素 FID（读取几何以便精确筛选；where 引用的字段不能被忽略），再按 FID 分段读取
+            fids = pyogrio.raw.read(input_file, layer=layer, columns=None if where else [], read_geometry=True,
+                                    return_fids=True, **filters)[1][start:]
+            for offset in range(0, max(len(fids), 1), batch_size):
+                yield pyogrio.read_dataframe(input_file, layer=layer, columns=fields, read_geometry=geometry,
+                                             fids=fids[offset:offset + batch_size])
+            return
+        
+        # 无 Arrow 时按 skip/max 分段读取
+        offset = start
+        while True:
+            df = pyogrio.read_dataframe(input_file, layer=layer, columns=fields, read_geometry=geometry,
+                                        skip_features=offset, max_features=batch_size, **filters)
+            if len(df) or offset == start:
+                yield df
+            if len(df) < batch_size:
+                return
+            offset += batch_size
+    
+    elif engine == 'fiona':
+        import fiona
+        
+        # 通过 fiona 逐要素读取属性
+        if mask is not None:
+            import shapely.geometry
+            
+            filters['mask'] = shapely.geometry.mapping(mask)
+        if geometry:
+            from shapely.geometry import shape
+        with fiona.open(input_file, layer=layer, ignore_geometry=not geometry) as src:
+            properties_schema = src.schema['properties']
+            present = [f for f in (fields or properties_schema) if f in properties_schema]
+            columns = present + [GEOMETRY_COLUMN] if geometry else present
+            date_fields = [f for f in present if properties_schema[f].split(':')[0] in ('date', 'datetime')]
+            rows = []
+            features = src.filter(**filters) if filters else src
+            for feature in itertools.islice(features, start, None):
+                properties = feature['properties']
+                row = [properties[f] for f in present]
+                if geometry:
+                    row.append(shape(feature['geometry']) if feature['geometry'] else None)
+                rows.append(row)
+                if len(rows) >= batch_size:
+                    yield _fiona_frame(rows, columns, date_fields)
+                    rows = []
+            yield _fiona_frame(rows, columns, date_fields)
+    
+    else:
+        raise ValueError(f"不支持的读取引擎：{engine}")
+
+
+def _iter_frame_batches(df, batch_size=READ_BATCH_SIZE, start=0):
+    """将已读入内存的 DataFrame 从第 start 行起切分为批"""
+    df = df.iloc[start:]
+    for offset in range(0, max(len(df), 1), batch_size):
+        yield df.iloc[offset:offset + batch_size]
+
+
+def _feature_count(input_file, layer=None, filtered=False):
+    """读取图层要素数（仅在驱动能快速获取时），用于显示进度；有筛选条件时筛选后的要素数未知"""
+    if filtered or not _has_module('pyogrio'):
+        return None
+    import pyogrio
+    
+    try:
+        count = pyogrio.read_info(input_file, layer=layer)['features']
+    except Exception:
+        return None
+    return count if count >= 0 else None
+
+
+def _layer_crs(input_file, layer=None):
+    """读取图层坐标系（如 "EPSG:4326" 或 WKT），用于几何列投影；没有坐标系时返回 None"""
+    if _has_module('pyogrio'):
+        import pyogrio
+        
+        return pyogrio.read_info(input_file, layer=layer)['crs']
+    import fiona
+    
+    with fiona.open(input_file, layer=layer) as src:
+        return src.crs.to_string() if src.crs else None
+
+
+def _iter_opened_batches(input_file, fields=None, layer=None, batch_size=READ_BATCH_SIZE, engine='auto', status=None,
+                         start=0, where=None, bbox=None, mask=None, geometry=False):
+    """打开数据源并逐批产出全部批次（包括第一批），参数同 _open_batches
+
+    数据源在迭代它的线程中打开，关闭（close() 或迭代结束）也应在同一线程中进行（见 pipeline.Prefetcher）。
+    """
+    first_batch, batches = _open_batches(input_file, fields, layer, batch_size, engine, status, start,
+                                         where, bbox, mask, geometry)
+    yield first_batch
+    yield from batches
+
+
+def _open_batches(input_file, fields=None, layer=None, batch_size=READ_BATCH_SIZE, engine='auto', status=None,
+                  start=0, where=None, bbox=None, mask=None, geometry=False):
+    """打开数据源并读取第一批，返回 (第一批, 后续批)
+
+    engine 为 auto 时依次尝试多种方式，读到第一批即视为成功；指定引擎时不回退。
+    start 为跳过的要素数（断点续传时使用）；where/bbox/mask 为筛选条件，geometry 为是否读取几何
+    （见 _iter_attribute_batches）。
+    """
+    status = status or (lambda text: None)
+    filters = _filter_kwargs(where, bbox, mask)
+    
+    if engine != 'auto':
+        status("正在读取属性数据...")
+        batches = _iter_attribute_batches(input_file, fields, layer, batch_size, engine, start,
+                                          geometry=geometry, **filters)
+        return next(batches), batches
+    
+    fallback_engine = 'pyogrio' if _has_module('pyogrio') else 'fiona'
+    try:
+        # 方式1: 按列投影流式读取（Shapefile 直接读取 DBF，其他格式用 pyogrio/Arrow）
+        status("正在读取属性数据...")
+        batches = _iter_attribute_batches(input_file, fields, layer, batch_size,
+                                          _default_engine(input_file, bool(filters) or geometry), start,
+                                          geometry=geometry, **filters)
+        return next(batches), batches
+    except Exception as e1:
+        status("读取失败，尝试不使用Arrow读取...")
+        try:
+            # 方式2: 不使用Arrow分段读取
+            batches = _iter_attribute_batches(input_file, fields, layer, batch_size, fallback_engine, start,
+                                              geometry=geometry, **filters)
+            return next(batches), batches
+        except Exception as e2:
+            status("方式2失败，尝试设置环境变量...")
+            try:
+                # 方式3: 设置环境变量后重试
+                os.environ['GDAL_DISABLE_READDIR_ON_OPEN'] = 'EMPTY_DIR'
+                batches = _iter_attribute_batches(input_file, fields, layer, batch_size, fallback_engine, start,
+                                                  geometry=geometry, **filters)
+                return next(batches), batches
+            except Exception as e3:
+                status("方式3失败，尝试读取属性表...")
+                
+                # 方式4: 如果是shapefile，尝试忽略几何读取全部属性
+                if input_file.lower().endswith('.shp'):
+                    try:
+                        dbf_file = input_file[:-4] + '.dbf'
+                        if os.path.exists(dbf_file):
+                            import geopandas as gpd
+                            
+                            df = gpd.read_file(input_file, ignore_geometry=not geometry, **filters)
+                            batches = _iter_frame_batches(df, batch_size, start)
+                            return next(batches), batches
+                        else:
+                            raise Exception("无法找到对应的DBF文件")
+                    except Exception as e4:
+                        status("读取失败")
+                        if filters:
+                            raise Exception(f"无法按筛选条件读取数据，请检查筛选条件（中文字段名需用双引号括起）：{e1}")
+                        raise Exception("无法读取完整数据，请检查文件格式")
+                else:
+                    status("读取失败")
+                    if filters:
+                        raise Exception(f"无法按筛选条件读取数据，请检查筛选条件（中文字段名需用双引号括起）：{e1}")
+                    raise Exception("无法读取完整数据，不支持的文件格式")
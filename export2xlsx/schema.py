@@ -0,0 +1,124 @@
+"""图层结构探测：只读取字段名、类型、别名、值域和要素数，不解码任何要素"""
+
+import collections
+import functools
+import os
+import sqlite3
+
+from .dbf import dbf_field_dtype, read_dbf_header
+from .reader import _has_module
+
+# 字段信息：名称、pandas dtype 名称、别名（无别名时为 None）、值域 {编码: 描述}（无值域时为 None）
+FieldInfo = collections.namedtuple('FieldInfo', 'name dtype alias domain', defaults=(None,))
+
+# 图层结构：字段列表、要素数（无法快速获取时为 None）、图层名称
+LayerSchema = collections.namedtuple('LayerSchema', 'fields feature_count layer')
+
+
+def _source_stamp(input_file):
+    """数据源的修改时间戳；Shapefile 同时考虑旁边的 .dbf"""
+    paths = [input_file]
+    if input_file.lower().endswith('.shp'):
+        paths.append(input_file[:-4] + '.dbf')
+    stamps = [os.stat(path).st_mtime_ns for path in paths if os.path.exists(path)]
+    return max(stamps) if stamps else None
+
+
+def _gpkg_column_metadata(input_file, table_name):
+    """从 GeoPackage 的 gpkg_data_columns 与 gpkg_data_column_constraints 读取字段别名和枚举值域
+
+    返回 ({字段: 别名}, {字段: {编码: 描述}})。
+    """
+    if not input_file.lower().endswith('.gpkg') or not table_name:
+        return {}, {}
+    aliases = {}
+    domains = {}
+    try:
+        uri = 'file:' + os.path.abspath(input_file).replace('\\', '/') + '?mode=ro'
+        with sqlite3.connect(uri, uri=True) as conn:
+            rows = conn.execute(
+                "SELECT column_name, name, title, constraint_name FROM gpkg_data_columns WHERE table_name = ?",
+                (table_name,)
+            ).fetchall()
+            for column, name, title, constraint_name in rows:
+                if name or title:
+                    aliases[column] = name or title
+                if constraint_name:
+                    # 只有 enum 类型的约束是“编码→描述”的值域（range/glob 不影响显示）
+                    values = conn.execute(
+                        "SELECT value, description FROM gpkg_data_column_constraints "
+                        "WHERE constraint_name = ? AND constraint_type = 'enum'",
+                        (constraint_name,)
+                    ).fetchall()
+                    if values:
+                        domains[column] = {value: description or value for value, description in values}
+    except sqlite3.Error:
+        pass
+    return aliases, domains
+
+
+def _probe_pyogrio(input_file, layer):
+    """通过 pyogrio.read_info 读取图层元数据"""
+    import pyogrio
+    
+    info = pyogrio.read_info(input_file, layer=layer)
+    layer_name = info.get('layer_name') or layer
+    aliases, domains = _gpkg_column_metadata(input_file, layer_name)
+    fields = [
+        FieldInfo(str(name), str(dtype), aliases.get(name), domains.get(name))
+        for name, dtype in zip(info['fields'], info['dtypes'])
+    ]
+    count = info['features']
+    return LayerSchema(fields, count if count >= 0 else None, layer_name)
+
+
+def _probe_fiona(input_file, layer):
+    """通过 fiona 读取图层的字段定义"""
+    import fiona
+    
+    with fiona.open(input_file, layer=layer) as src:
+        layer_name = getattr(src, 'name', None) or layer
+        aliases, domains = _gpkg_column_metadata(input_file, layer_name)
+        fields = [
+            FieldInfo(name, field_type.split(':')[0], aliases.get(name), domains.get(name))
+            for name, field_type in src.schema['properties'].items()
+        ]
+    return LayerSchema(fields, None, layer_name)
+
+
+def _probe_dbf(input_file, layer):
+    """直接解析 Shapefile 旁边 .dbf 的文件头"""
+    if not input_file.lower().endswith('.shp'):
+        raise Exception("不支持的文件格式")
+    dbf_file = input_file[:-4] + '.dbf'
+    if not os.path.exists(dbf_file):
+        raise Exception("找不到对应的DBF文件")
+    header = read_dbf_header(dbf_file)
+    fields = [FieldInfo(field.name, dbf_field_dtype(field), None) for field in header.fields]
+    return LayerSchema(fields, header.record_count, layer)
+
+
+@functools.lru_cache(maxsize=64)
+def _read_schema_cached(input_file, layer, stamp):
+    """按 (路径, 图层, 修改时间) 缓存的结构探测，依次尝试多种方式"""
+    probes = [_probe_dbf] if input_file.lower().endswith('.shp') else []
+    if _has_module('pyogrio'):
+        probes.insert(0, _probe_pyogrio)
+    if _has_module('fiona'):
+        probes.append(_probe_fiona)
+    
+    for probe in probes:
+        try:
+            return probe(input_file, layer)
+        except Exception:
+            continue
+    raise Exception("无法读取图层结构。请检查文件格式或投影系统。")
+
+
+def read_schema(input_file, layer=None):
+    """读取图层结构（字段名、类型、别名、值域、要素数），不解码任何要素
+
+    结果按 (路径, 修改时间) 缓存，重复打开同一个文件时立即返回。
+    """
+    input_file = os.path.abspath(input_file)
+    return _read_schema_cached(input_file, layer, _source_stamp(input_file))
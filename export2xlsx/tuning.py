@@ -0,0 +1,92 @@
+"""批大小自动选择、按内存阈值触发的垃圾回收与按时间节流的进度回调"""
+
+import gc
+import time
+
+from .perf import current_rss
+
+# 每批数据（读取的 DataFrame 与写入时展开的值列表）的目标内存
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# 自动批大小的上下限
+MIN_BATCH_ROWS = 1000
+MAX_BATCH_ROWS = 50000
+
+# 进度回调的最小间隔（秒）
+PROGRESS_INTERVAL = 0.25
+
+# 估算每个单元格占用的内存：数值在 DataFrame 中 8 字节，
+# 写入时展开为 Python 对象约 32 字节；字符串按平均长度的 Python str 估算
+_NUMERIC_CELL_BYTES = 40
+_TEXT_CELL_BYTES = 120
+
+# 读取几何（用于计算几何派生列）时每行 WKB 的估算字节数
+GEOMETRY_ROW_BYTES = 1024
+
+
+def estimate_row_bytes(dtypes):
+    """按字段 dtype 名称估算每行占用的内存字节数（geometry 按 GEOMETRY_ROW_BYTES 计）"""
+    row_bytes = 0
+    for dtype in dtypes:
+        dtype = str(dtype)
+        if dtype == 'geometry':
+            row_bytes += GEOMETRY_ROW_BYTES
+        elif dtype.startswith(('int', 'uint', 'float', 'bool', 'datetime', 'timedelta')):
+            row_bytes += _NUMERIC_CELL_BYTES
+        else:
+            row_bytes += _TEXT_CELL_BYTES
+    return max(row_bytes, 1)
+
+
+def auto_batch_size(dtypes, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """根据行宽与目标内存选择每批行数"""
+    rows = memory_budget // estimate_row_bytes(dtypes)
+    return int(min(max(rows, MIN_BATCH_ROWS), MAX_BATCH_ROWS))
+
+
+class MemoryGuard:
+    """只在进程常驻内存超过阈值时才做一次完整垃圾回收
+
+    阈值为开始时的内存加上 4 倍批内存预算；回收后仍超出时上调阈值，
+    避免在内存确实被占用时每批都做一次全量回收。
+    """
+    
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self.collections = 0
+        rss = current_rss()
+        self.threshold = rss + 4 * memory_budget if rss is not None else None
+    
+    def check(self):
+        """检查内存，超过阈值时回收；返回是否做了回收"""
+        if self.threshold is None:
+            return False
+        rss = current_rss()
+        if rss is None or rss < self.threshold:
+            return False
+        
+        gc.collect()
+        self.collections += 1
+        rss = current_rss() or rss
+        if rss >= self.threshold:
+            self.threshold = rss + self.memory_budget
+        return True
+
+
+class ProgressThrottle:
+    """按时间节流进度回调：两次回调至少间隔 interval 秒，完成时总会回调"""
+    
+    def __init__(self, callback, interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.interval = interval
+        self._last = None
+    
+    def update(self, done, total=None, force=False):
+        """报告进度；未到间隔时忽略（force 或已完成时除外）"""
+        if self.callback is None:
+            return
+        now = time.monotonic()
+        finished = total is not None and done >= total
+        if force or finished or self._last is None or now - self._last >= self.interval:
+            self._last = now
+            self.callback(done, total)
@@ -0,0 +1,476 @@
+"""XLSX 写入：按列规划类型的行写入引擎，以及支持自动分表/分文件的流式写入器"""
+
+import functools
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+import xlsxwriter.workbook
+from xlsxwriter.utility import xl_rowcol_to_cell_fast
+from xlsxwriter.worksheet import Worksheet
+
+from .categorical import SHARED_STRING_LIMIT, is_low_cardinality
+from .perf import null_phase
+
+# 列写入类型：推断 dtype 后映射到 XlsxWriter 的类型专用写入方法
+_INFERRED_KINDS = {
+    'string': 'string',
+    'empty': 'blank',
+    'boolean': 'bool',
+    'integer': 'number',
+    'floating': 'number',
+    'mixed-integer-float': 'number',
+    'decimal': 'number',
+    'datetime64': 'datetime',
+    'datetime': 'datetime',
+    'date': 'date',
+}
+
+# Excel 1900 日期系统的起点（序列日期 1 = 1900-01-01）
+_EXCEL_EPOCH = pd.Timestamp('1899-12-31')
+
+
+def _column_kind(series):
+    """判断一列的写入类型：number/string/datetime/date/bool/blank/generic"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # 分类列（读取时低基数的文本列）按类别值判断
+        return _column_kind(pd.Series(dtype.categories)) if len(dtype.categories) else 'blank'
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+    if pd.api.types.is_complex_dtype(dtype):
+        return 'generic'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'number'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        # 时间部分全为零点的列（如 Shapefile 的日期字段）只显示日期
+        values = series.dropna()
+        return 'date' if (values == values.dt.normalize()).all() else 'datetime'
+    return _INFERRED_KINDS.get(pd.api.types.infer_dtype(series, skipna=True), 'generic')
+
+
+def _plan_columns(df, fields):
+    """对每列只做一次类型判断，返回各列的写入类型"""
+    return [_column_kind(df[field]) for field in fields]
+
+
+def _column_values(series, kind):
+    """将一列整体转换为 Python 值列表，空值统一为 None"""
+    if isinstance(series.dtype, pd.CategoricalDtype) and kind != 'string':
+        series = pd.Series(np.asarray(series), index=series.index)
+    if kind == 'number':
+        arr = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        values = arr.astype(object)
+        # NaN/inf 无法写入数值单元格，与原逻辑一致写为空白
+        values[~np.isfinite(arr)] = None
+        return values.tolist()
+    if kind in ('datetime', 'date'):
+        if getattr(series.dtype, 'tz', None) is not None:
+            series = series.dt.tz_localize(None)
+        elif not pd.api.types.is_datetime64_any_dtype(series.dtype):
+            series = pd.to_datetime(series, errors='coerce')
+        # 整列换算为 Excel 序列日期，避免逐个单元格转换 datetime
+        serial = ((series - _EXCEL_EPOCH) / pd.Timedelta(days=1)).to_numpy(dtype='float64', na_value=np.nan)
+        # Excel 1900 日期系统把 1900-02-29 视为有效日期
+        serial = np.where(serial > 59, serial + 1, serial)
+        values = serial.astype(object)
+        values[np.isnan(serial)] = None
+        return values.tolist()
+    if kind == 'blank':
+        return [None] * len(series)
+    values = series.to_numpy(dtype=object, na_value=None, copy=True)
+    if kind == 'string':
+        values[values == ""] = None
+    return values.tolist()
+
+
+class _SharedStringCell:
+    """共享字符串单元格：只保存共享字符串表中的序号"""
+    
+    __slots__ = ('index', 'format')
+    
+    def __init__(self, index, cell_format):
+        self.index = index
+        self.format = cell_format
+
+
+class SharedStringWorksheet(Worksheet):
+    """constant_memory 模式下也能写入共享字符串的工作表
+
+    XlsxWriter 的 constant_memory 模式只写内联字符串，每个单元格都重复保存一遍文本；
+    低基数的文本列改经 write_shared_string 写入共享字符串表中的序号，
+    每个不重复的值在 sharedStrings.xml 中只保存、转义一次。
+    依赖 XlsxWriter 的内部接口，requirements.txt 固定了测试过的版本范围。
+    """
+    
+    def write_shared_string(self, row, col, index, cell_format=None):
+        """写入共享字符串表中第 index 个字符串（序号由 shared_string_indices 取得）"""
+        if self._check_dimensions(row, col):
+            return -1
+        if self.constant_memory and row > self.previous_row:
+            self._write_single_row(row)
+        self.table[row][col] = _SharedStringCell(index, cell_format)
+        return 0
+    
+    def _write_cell(self, row, col, cell):
+        if cell.__class__ is not _SharedStringCell:
+            super()._write_cell(row, col, cell)
+            return
+        attributes = [('r', xl_rowcol_to_cell_fast(row, col))]
+        if cell.format:
+            attributes.append(('s', cell.format._get_xf_index()))
+        self._xml_string_element(cell.index, attributes)
+
+
+def _shared_string_values(worksheet, series):
+    """将低基数的文本列转换为共享字符串序号列表（空值、空字符串为 None）
+
+    每个不重复的值只查一次共享字符串表；不是低基数列或共享字符串表已满时返回 None，改写内联字符串。
+    """
+    codes, uniques = pd.factorize(series)
+    str_table = worksheet.str_table
+    if not is_low_cardinality(len(uniques), len(series)) \
+            or str_table.unique_count + len(uniques) > SHARED_STRING_LIMIT:
+        return None
+    
+    # 末尾的 None 对应 factorize 的缺失值编码 -1
+    indices = np.full(len(uniques) + 1, None, dtype=object)
+    looked_up = 0
+    for i, value in enumerate(np.asarray(uniques, dtype=object)):
+        if value != "":
+            indices[i] = str_table._get_shared_string_index(value[:worksheet.xls_strmax])
+            looked_up += 1
+    values = indices[codes]
+    # 查表时每个值已计数一次，其余的引用次数一并补上（count 写入 sharedStrings.xml）
+    str_table.count += int(pd.notna(values).sum()) - looked_up
+    return values.tolist()
+
+
+def _convert_columns(worksheet, df, fields, kinds, formats):
+    """按列预先转换为值列表，并为每列选好类型专用的 write_* 方法与格式"""
+    writers = {
+        'number': worksheet.write_number,
+        'string': worksheet.write_string,
+        'datetime': worksheet.write_number,
+        'date': worksheet.write_number,
+        'bool': worksheet.write_boolean,
+        'blank': worksheet.write_blank,
+        'generic': worksheet.write,
+    }
+    write_shared_string = getattr(worksheet, 'write_shared_string', None)
+    columns = []
+    for col, (field, kind) in enumerate(zip(fields, kinds)):
+        fmt = formats.get(kind, formats['cell'])
+        if kind == 'string' and write_shared_string is not None:
+            values = _shared_string_values(worksheet, df[field])
+            if values is not None:
+                columns.append((col, write_shared_string, fmt, values, False))
+                continue
+        columns.append((col, writers[kind], fmt, _column_values(df[field], kind), kind == 'generic'))
+    return columns
+
+
+def _write_columns(worksheet, columns, row_count, first_row):
+    """逐行写入 _convert_columns 转换好的列"""
+    write_blank = worksheet.write_blank
+    for offset in range(row_count):
+        row = first_row + offset
+        for col, write, fmt, values, fallback in columns:
+            value = values[offset]
+            if value is None:
+                write_blank(row, col, None, fmt)
+            elif fallback:
+                try:
+                    write(row, col, value, fmt)
+                except Exception:
+                    # 无法识别的值写入空白，与原逻辑一致
+                    write_blank(row, col, None, fmt)
+            else:
+                write(row, col, value, fmt)
+
+
+def _write_rows(worksheet, df, fields, kinds, first_row, formats):
+    """按列预先转换，再逐行调用类型专用的 write_* 方法写入"""
+    columns = _convert_columns(worksheet, df, fields, kinds, formats)
+    _write_columns(worksheet, columns, len(df), first_row)
+
+
+# 列宽（字符数）的上下限与两侧留白；每段数据只抽样 COLUMN_WIDTH_SAMPLE 行估算列宽
+MIN_COLUMN_WIDTH = 6
+MAX_COLUMN_WIDTH = 50
+COLUMN_WIDTH_SAMPLE = 200
+_COLUMN_PADDING = 2
+
+# 宽度固定的列类型（日期按所用的数字格式，布尔值为 FALSE）
+_KIND_WIDTHS = {'datetime': 19, 'date': 10, 'bool': 5, 'blank': 0}
+
+
+def _text_width(text):
+    """文本的显示宽度：ASCII 字符计 1，中日韩等全角字符计 2
+
+    UTF-8 编码下 ASCII 占 1 字节、中日韩字符占 3 字节，(字符数 + 字节数) // 2 正好得到显示宽度，
+    不必逐个字符查 Unicode 宽度属性。
+    """
+    return (len(text) + len(text.encode('utf-8', errors='replace'))) // 2
+
+
+def _sample_width(series, kind):
+    """一列抽样值的最大显示宽度"""
+    if kind in _KIND_WIDTHS:
+        return _KIND_WIDTHS[kind]
+    values = series.dropna()
+    if kind == 'number':
+        # “常规”格式下数值最多显示约 10 位有效数字
+        values = pd.to_numeric(values, errors='coerce').dropna()
+        return max((len(f"{value:.10g}") for value in values), default=0)
+    return max((_text_width(str(value)) for value in values.unique()), default=0)
+
+
+class ColumnWidths:
+    """流式写入时估算各列宽度，不需要为列宽再遍历一遍数据
+
+    每写一段数据随机抽样至多 COLUMN_WIDTH_SAMPLE 行，保留各列（含表头）显示宽度的最大值。
+    不用等间隔抽样：步长会与周期性的数据（如按行交替的取值）对齐，整类取值始终抽不到。
+    constant_memory 模式下列宽在关闭工作簿时才写入工作表，因此写完一个工作表后再 apply 即可。
+    """
+    
+    def __init__(self, headers):
+        self.widths = [_text_width(str(header)) for header in headers]
+        # 固定种子，同样的数据得到同样的列宽
+        self._random = np.random.default_rng(0)
+    
+    def update(self, df, fields, kinds):
+        """用一段数据的抽样更新列宽"""
+        if not len(df):
+            return
+        sample = df
+        if len(df) > COLUMN_WIDTH_SAMPLE:
+            sample = df.iloc[self._random.integers(0, len(df), COLUMN_WIDTH_SAMPLE)]
+        for col, (field, kind) in enumerate(zip(fields, kinds)):
+            width = _sample_width(sample[field], kind)
+            if width > self.widths[col]:
+                self.widths[col] = width
+    
+    def merge(self, widths):
+        """合并另一份估算结果（如并行写入进程返回的 widths）"""
+        self.widths = [max(a, b) for a, b in zip(self.widths, widths)]
+    
+    def apply(self, worksheet):
+        """把估算的列宽设置到工作表"""
+        for col, width in enumerate(self.widths):
+            worksheet.set_column(col, col, min(max(width + _COLUMN_PADDING, MIN_COLUMN_WIDTH), MAX_COLUMN_WIDTH))
+
+
+# 导出样式：数据单元格是否加边框格式，以及打包时的 zip 压缩级别（None 为 zlib 默认的 6）
+# fast     不给数据单元格加格式（日期列只带数字格式），压缩级别 1：文件稍大，压缩保存快得多
+# balanced 不给数据单元格加格式，默认压缩级别：文件最小
+# styled   每个单元格带边框（原来的样式），默认压缩级别
+EXPORT_STYLES = {
+    'fast': {'border': False, 'compresslevel': 1},
+    'balanced': {'border': False, 'compresslevel': None},
+    'styled': {'border': True, 'compresslevel': None},
+}
+DEFAULT_STYLE = 'styled'
+
+# XlsxWriter 不提供压缩级别选项，关闭时临时替换其模块中的 ZipFile；多个线程同时关闭时依次进行
+_ZIP_LOCK = threading.Lock()
+
+
+def close_workbook(workbook, compresslevel=None):
+    """关闭（压缩打包）工作簿；compresslevel 为 zip 压缩级别 0-9，None 时使用默认级别"""
+    if compresslevel is None:
+        workbook.close()
+        return
+    with _ZIP_LOCK:
+        zip_file = xlsxwriter.workbook.ZipFile
+        xlsxwriter.workbook.ZipFile = functools.partial(zip_file, compresslevel=compresslevel)
+        try:
+            workbook.close()
+        finally:
+            xlsxwriter.workbook.ZipFile = zip_file
+
+
+def add_formats(workbook, border):
+    """在工作簿中创建表头与数据单元格格式，返回 (表头格式, {写入类型: 格式})
+
+    按固定顺序预先分配 XF 序号：并行写入时各进程分别生成工作表数据，
+    同样的格式在每个工作簿中都得到同样的序号。
+    """
+    header_format = workbook.add_format({
+        'bold': True,
+        'bg_color': '#D9D9D9',
+        'border': 1,
+        'align': 'center',
+        'valign': 'vcenter'
+    })
+    
+    # 数据单元格的格式；不加边框时普通单元格不带格式，日期列仍需数字格式，否则 Excel 中显示为序列数
+    border = {'border': 1, 'align': 'left', 'valign': 'vcenter'} if border else {}
+    formats = {
+        'cell': workbook.add_format(border) if border else None,
+        'datetime': workbook.add_format(dict(border, num_format='yyyy-mm-dd hh:mm:ss')),
+        'date': workbook.add_format(dict(border, num_format='yyyy-mm-dd')),
+    }
+    for cell_format in [header_format] + list(formats.values()):
+        if cell_format is not None:
+            cell_format._get_xf_index()
+    return header_format, formats
+
+
+# Excel 单个工作表最多 1,048,576 行（含表头），工作表名称最长 31 个字符
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_SHEET_NAME = 31
+
+
+def _split_sheet_name(base, index):
+    """第 1 个工作表保持原名，之后依次为 base_2、base_3 ..."""
+    if index == 1:
+        return base[:EXCEL_MAX_SHEET_NAME]
+    suffix = f"_{index}"
+    return base[:EXCEL_MAX_SHEET_NAME - len(suffix)] + suffix
+
+
+def _split_file_path(path, index):
+    """第 1 个文件保持原名，之后依次为 name_2.xlsx、name_3.xlsx ..."""
+    if index == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{index}{ext}"
+
+
+class XlsxStreamWriter:
+    """以 constant_memory 模式逐批写入 XLSX，每批写完即可释放
+
+    超过单表行数上限时自动续写到 Sheet1_2、Sheet1_3 ...（每个工作表重复表头）；
+    设置 max_rows_per_file / max_bytes_per_file 后，达到预算时续写到新的工作簿
+    name_2.xlsx、name_3.xlsx ...。字节预算按已写出的未压缩工作表数据估算。
+    传入 profile（perf.ExportProfile）时记录转换、写入与压缩保存各阶段的耗时。
+    first_file_index 为第一个文件的序号（断点续传时从已完成的分段之后继续编号）；
+    on_file_closed(路径, 行数) 在每个工作簿正常关闭后调用。
+    style 为 EXPORT_STYLES 中的导出样式。
+    """
+    
+    def __init__(self, output_path, sheet_name, fields, headers=None,
+                 max_rows_per_sheet=None, max_rows_per_file=None, max_bytes_per_file=None, profile=None,
+                 first_file_index=1, on_file_closed=None, style=DEFAULT_STYLE):
+        if style not in EXPORT_STYLES:
+            raise Exception(f"未知的导出样式：{style}")
+        self.output_path = output_path
+        self.sheet_name = sheet_name or "Sheet1"
+        self.fields = list(fields)
+        self.headers = list(headers or self.fields)
+        self.max_rows_per_sheet = min(max_rows_per_sheet or EXCEL_MAX_ROWS - 1, EXCEL_MAX_ROWS - 1)
+        self.max_rows_per_file = max_rows_per_file
+        self.max_bytes_per_file = max_bytes_per_file
+        self.rows_written = 0
+        self.output_paths = []
+        self.first_file_index = first_file_index
+        self.on_file_closed = on_file_closed
+        self.style = EXPORT_STYLES[style]
+        self.workbook = None
+        self.worksheet = None
+        self._phase = profile.phase if profile is not None else null_phase
+        self._open_workbook()
+    
+    def _open_workbook(self):
+        """创建下一个工作簿及其第一个工作表"""
+        path = _split_file_path(self.output_path, self.first_file_index + len(self.output_paths))
+        self.workbook = xlsxwriter.Workbook(
+            path,
+            {
+                'constant_memory': True,  # 启用常量内存模式
+                'strings_to_formulas': False,
+                'strings_to_urls': False,
+            }
+        )
+        self.output_paths.append(path)
+        
+        # 设置格式
+        self.header_format, self.formats = add_formats(self.workbook, self.style['border'])
+        
+        self.worksheet = None
+        self._sheet_count = 0
+        self._file_rows = 0
+        self._closed_sheet_bytes = 0
+        self._add_sheet()
+    
+    def _add_sheet(self):
+        """在当前工作簿中新建工作表并写入表头"""
+        if self.worksheet is not None:
+            self._column_widths.apply(self.worksheet)
+            self._closed_sheet_bytes += self._sheet_bytes()
+        self._sheet_count += 1
+        self.worksheet = self.workbook.add_worksheet(_split_sheet_name(self.sheet_name, self._sheet_count),
+                                                     worksheet_class=SharedStringWorksheet)
+        self._sheet_rows = 0
+        
+        # 写入表头
+        for col, display_name in enumerate(self.headers):
+            self.worksheet.write(0, col, display_name, self.header_format)
+        
+        # 按表头与写入的数据抽样自动调整列宽
+        self._column_widths = ColumnWidths(self.headers)
+    
+    def _sheet_bytes(self):
+        """当前工作表已写出的行数据字节数（constant_memory 模式下的临时文件大小）"""
+        fh = getattr(self.worksheet, 'row_data_fh', None)
+        if fh is None:
+            return 0
+        fh.flush()
+        return os.fstat(fh.fileno()).st_size
+    
+    def _file_full(self):
+        """当前工作簿是否已达到行数或字节预算"""
+        if not self._file_rows:
+            return False
+        if self.max_rows_per_file and self._file_rows >= self.max_rows_per_file:
+            return True
+        if self.max_bytes_per_file and self._closed_sheet_bytes + self._sheet_bytes() >= self.max_bytes_per_file:
+            return True
+        return False
+    
+    def write_batch(self, df):
+        """写入一批数据，必要时在批内切换工作表或工作簿"""
+        start = 0
+        while start < len(df):
+            if self._file_full():
+                self._close_workbook()
+                self._open_workbook()
+            elif self._sheet_rows >= self.max_rows_per_sheet:
+                self._add_sheet()
+            
+            space = self.max_rows_per_sheet - self._sheet_rows
+            if self.max_rows_per_file:
+                space = min(space, self.max_rows_per_file - self._file_rows)
+            part = df.iloc[start:start + space]
+            self._write_part(part)
+            
+            self._sheet_rows += len(part)
+            self._file_rows += len(part)
+            self.rows_written += len(part)
+            start += len(part)
+    
+    def _write_part(self, part):
+        """把一段数据写入当前工作表（写在已写的 _sheet_rows 行之后）"""
+        # 每段单独判断列类型，避免首批全为空值时误判
+        with self._phase('convert', len(part)):
+            kinds = _plan_columns(part, self.fields)
+            columns = _convert_columns(self.worksheet, part, self.fields, kinds, self.formats)
+            self._column_widths.update(part, self.fields, kinds)
+        with self._phase('write', len(part)):
+            _write_columns(self.worksheet, columns, len(part), self._sheet_rows + 1)  # +1 for header
+    
+    def _close_workbook(self):
+        """关闭（压缩打包）当前工作簿并通知 on_file_closed"""
+        self._column_widths.apply(self.worksheet)
+        with self._phase('close'):
+            close_workbook(self.workbook, self.style['compresslevel'])
+        if self.on_file_closed is not None:
+            self.on_file_closed(self.output_paths[-1], self._file_rows)
+    
+    def close(self):
+        """关闭当前工作簿（压缩打包），返回全部输出文件路径"""
+        self._close_workbook()
+        return self.output_paths
@@ -0,0 +1,122 @@
+"""测试用的小图层，以及原实现（整表 gpd.read_file + iterrows 逐单元格写入）的参照输出"""
+
+import datetime
+
+import pandas as pd
+import xlsxwriter
+
+from export2xlsx.reader import _has_module
+
+DISTRICTS = ["城关区", "七里河区", "西固区", "安宁区"]
+FIELDS = ['编号', '名称', '行政区', '面积', '登记日期']
+
+# 写入测试图层与生成参照输出所需的模块
+REQUIRED = ('pyogrio', 'pyarrow', 'shapely', 'geopandas', 'openpyxl')
+AVAILABLE = all(_has_module(name) for name in REQUIRED)
+SKIP_REASON = f"需要 {'、'.join(REQUIRED)}"
+
+
+def layer_columns(rows):
+    """测试图层的属性：整数、含空值的中文文本、低基数文本、含空值的浮点与日期"""
+    return {
+        '编号': list(range(rows)),
+        '名称': [f"地块{i}号" if i % 11 else None for i in range(rows)],
+        '行政区': [DISTRICTS[i % len(DISTRICTS)] for i in range(rows)],
+        '面积': [round(i * 1.25, 2) if i % 9 else None for i in range(rows)],
+        '登记日期': [datetime.date(2000, 1, 1) + datetime.timedelta(days=i) if i % 13 else None
+                 for i in range(rows)],
+    }
+
+
+def point_coordinates(rows):
+    """第 i 个要素的点坐标（沿对角线均匀分布，便于按范围筛选）"""
+    return [103 + i / rows for i in range(rows)], [36 + i / rows for i in range(rows)]
+
+
+def write_layer(path, rows=500, layer=None, encoding=None):
+    """按扩展名写出点图层（.shp/.gpkg/.geojson），返回写入的属性 {字段: 值列表}"""
+    import pyarrow as pa
+    import pyogrio
+    import shapely
+
+    columns = layer_columns(rows)
+    arrays = {name: pa.array(values, pa.date32() if name == '登记日期' else None)
+              for name, values in columns.items()}
+    xs, ys = point_coordinates(rows)
+    options = {'encoding': encoding} if encoding else {}
+    pyogrio.write_arrow(pa.table({**arrays, 'geometry': shapely.to_wkb(shapely.points(xs, ys))}), path,
+                        layer=layer, geometry_name='geometry', geometry_type='Point', crs='EPSG:4326', **options)
+    return columns
+
+
+def legacy_frame(path, fields=None, **options):
+    """原实现的读取方式：gpd.read_file 整表读入后选列"""
+    import geopandas as gpd
+
+    df = pd.DataFrame(gpd.read_file(path, ignore_geometry=True, **options))
+    return df[list(fields or df.columns)]
+
+
+def legacy_export(df, output_path, fields=None):
+    """原实现的 _export_to_xlsx：iterrows 逐行、逐单元格 worksheet.write，空值写为空字符串"""
+    fields = list(fields or df.columns)
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True, 'strings_to_formulas': False,
+                                                 'strings_to_urls': False})
+    worksheet = workbook.add_worksheet("Sheet1")
+    header_format = workbook.add_format({'bold': True, 'bg_color': '#D9D9D9', 'border': 1,
+                                         'align': 'center', 'valign': 'vcenter'})
+    cell_format = workbook.add_format({'border': 1, 'align': 'left', 'valign': 'vcenter'})
+    for col, field_name in enumerate(fields):
+        worksheet.write(0, col, field_name, header_format)
+    for row_idx, (_, row) in enumerate(df.iterrows()):
+        for col_idx, field_name in enumerate(fields):
+            try:
+                value = row[field_name]
+                if pd.isna(value):
+                    processed_value = ""
+                elif isinstance(value, str):
+                    processed_value = str(value)
+                else:
+                    processed_value = value
+                worksheet.write(row_idx + 1, col_idx, processed_value, cell_format)
+            except Exception:
+                worksheet.write(row_idx + 1, col_idx, "", cell_format)
+    workbook.close()
+    return [output_path]
+
+
+def _normalize(value):
+    """比较用的单元格值：日期转换为 Excel 序列数（原实现的日期没有数字格式，读回为数值），数值统一为 float"""
+    from openpyxl.utils.datetime import to_excel
+
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return round(float(to_excel(value)), 6)
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return round(float(value), 6)
+    return value
+
+
+def read_values(paths):
+    """读回全部输出文件、全部工作表的值：第一个表头加所有数据行（续表、续文件的表头不重复计入）"""
+    import openpyxl
+
+    rows = []
+    for path in paths:
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        for worksheet in workbook.worksheets:
+            sheet_rows = [tuple(_normalize(value) for value in row) for row in worksheet.iter_rows(values_only=True)]
+            rows.extend(sheet_rows if not rows else sheet_rows[1:])
+        workbook.close()
+    return rows
+
+
+def sheet_names(path):
+    """工作簿中的工作表名称"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    names = workbook.sheetnames
+    workbook.close()
+    return names
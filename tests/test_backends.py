@@ -0,0 +1,119 @@
+"""输出后端：多进程 XLSX 写入手工拼接工作表 XML，读回后与 XlsxStreamWriter 的输出逐个单元格比较"""
+
+import datetime
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+import layers
+from export2xlsx.backends import ParallelXlsxWriter
+from export2xlsx.core import export_layer
+from export2xlsx.writer import XlsxStreamWriter
+
+DISTRICTS = ["城关区", "七里河区", "西固区", "安宁区"]
+
+
+def make_frame(rows=500):
+    """低基数文本（XlsxStreamWriter 写为共享字符串）、高基数文本、数值、日期、布尔与空值"""
+    return pd.DataFrame({
+        '编号': range(rows),
+        '行政区': pd.Categorical([DISTRICTS[i % 4] if i % 7 else None for i in range(rows)]),
+        '名称': pd.Series([f"地块{i}号" if i % 11 else None for i in range(rows)], dtype=object),
+        '面积': [i * 1.5 if i % 9 else None for i in range(rows)],
+        '登记时间': pd.to_datetime([datetime.datetime(2000, 1, 1, i % 24) + datetime.timedelta(days=i)
+                                for i in range(rows)]),
+        '已核查': [bool(i % 2) for i in range(rows)],
+    })
+
+
+def read_cells(paths):
+    """读回各文件各工作表的单元格：[(文件序号, 工作表名, 坐标, 值, 数字格式, 左边框)]"""
+    import openpyxl
+
+    cells = []
+    for index, path in enumerate(paths):
+        workbook = openpyxl.load_workbook(path)
+        for worksheet in workbook.worksheets:
+            for row in worksheet.iter_rows():
+                for cell in row:
+                    cells.append((index, worksheet.title, cell.coordinate, cell.value, cell.number_format,
+                                  cell.border.left.style))
+        workbook.close()
+    return cells
+
+
+class ParallelXlsxWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.df = make_frame()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, writer_class, name, style, **options):
+        stream = writer_class(os.path.join(self.tmp.name, name), 'Sheet1', list(self.df.columns), style=style,
+                              max_rows_per_sheet=120, max_rows_per_file=300, **options)
+        for start in range(0, len(self.df), 45):
+            stream.write_batch(self.df.iloc[start:start + 45])
+        return stream.close()
+
+    def test_same_cells_as_stream_writer(self):
+        for style in ('styled', 'balanced', 'fast'):
+            with self.subTest(style=style):
+                expected = self._write(XlsxStreamWriter, f'stream_{style}.xlsx', style)
+                actual = self._write(ParallelXlsxWriter, f'parallel_{style}.xlsx', style, workers=1, part_rows=70)
+                self.assertEqual(len(actual), len(expected))
+                self.assertEqual(len(expected), 2)
+                expected_cells = read_cells(expected)
+                self.assertEqual(len(expected_cells), (len(self.df) + 5) * len(self.df.columns))
+                self.assertEqual(read_cells(actual), expected_cells)
+
+
+def frame_values(df):
+    """逐列的值（缺失值统一为 None，日期统一为 Timestamp），用于比较不同来源读回的表"""
+    return {name: [None if pd.isna(value) else pd.Timestamp(value) if isinstance(value, datetime.date) else value
+                   for value in df[name]] for name in df.columns}
+
+
+@unittest.skipUnless(layers.AVAILABLE, layers.SKIP_REASON)
+class FileBackendExportTest(unittest.TestCase):
+    """CSV/Parquet 导出（含分文件）读回后与原实现 gpd.read_file 读入的表相同"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'parcels.gpkg')
+        layers.write_layer(self.source)
+        self.expected = frame_values(layers.legacy_frame(self.source))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _export(self, extension):
+        output = os.path.join(self.tmp.name, f'out.{extension}')
+        paths = export_layer(self.source, output, max_rows_per_file=200, batch_size=70, chunk_size=30)
+        self.assertEqual(paths, [output] + [os.path.join(self.tmp.name, f'out_{i}.{extension}') for i in (2, 3)])
+        return paths
+
+    def test_csv(self):
+        paths = self._export('csv')
+        for path in paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.assertTrue(data.startswith('\ufeff编号,名称,行政区,面积,登记日期\r\n'.encode('utf-8')))
+            self.assertEqual(data.count(b'\n'), data.count(b'\r\n'))
+        df = pd.concat([pd.read_csv(path, encoding='utf-8-sig') for path in paths], ignore_index=True)
+        df['登记日期'] = pd.to_datetime(df['登记日期'])
+        self.assertEqual(frame_values(df), self.expected)
+
+    def test_parquet(self):
+        paths = self._export('parquet')
+        frames = [pd.read_parquet(path) for path in paths]
+        self.assertEqual([len(df) for df in frames], [200, 200, 100])
+        self.assertEqual(frame_values(pd.concat(frames, ignore_index=True)), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
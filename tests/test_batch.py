@@ -0,0 +1,56 @@
+"""批量导出的输出文件名：同名图层不能与其他图层拆分出的 name_2.xlsx 等文件重名"""
+
+import json
+import os
+import re
+import tempfile
+import unittest
+
+from export2xlsx.batch import export_batch, plan_batch
+
+
+class PlanBatchNamesTest(unittest.TestCase):
+
+    def test_names_do_not_collide_with_split_parts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ('a.shp', 'a.geojson', 'a_2.shp', 'a_shp.shp', 'b.kml'):
+                open(os.path.join(tmp, name), 'w').close()
+            names = [os.path.splitext(os.path.basename(output))[0].lower()
+                     for _, _, output in plan_batch(tmp, tmp)]
+        self.assertEqual(len(names), 5)
+        for name in names:
+            others = [other for other in names if other != name]
+            self.assertNotIn(name, others)
+            # 每个输出拆分出的 name_2、name_3 ... 不能是另一个输出的名称
+            split = re.compile(re.escape(name) + r'_\d+')
+            self.assertFalse([other for other in others if split.fullmatch(other)], names)
+
+
+class ExportBatchOutputDirTest(unittest.TestCase):
+
+    def _write_geojson(self, path):
+        features = [{'type': 'Feature', 'properties': {'编号': i, '名称': f"地块{i}号"},
+                     'geometry': {'type': 'Point', 'coordinates': [i, i]}} for i in range(3)]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'type': 'FeatureCollection', 'features': features}, f, ensure_ascii=False)
+
+    def test_missing_output_dir_is_created(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._write_geojson(os.path.join(tmp, 'a.geojson'))
+            output_dir = os.path.join(tmp, 'out', 'xlsx')
+            results = export_batch(tmp, output_dir, workers=1)
+            self.assertEqual([result.error for result in results], [None])
+            self.assertTrue(os.path.exists(os.path.join(output_dir, 'a.xlsx')))
+
+    def test_output_dir_that_cannot_be_created_fails_fast(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._write_geojson(os.path.join(tmp, 'a.geojson'))
+            blocker = os.path.join(tmp, 'file.txt')
+            open(blocker, 'w').close()
+            with self.assertRaises(Exception) as caught:
+                export_batch(tmp, os.path.join(blocker, 'out'), workers=1)
+            self.assertIn("无法创建输出目录", str(caught.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
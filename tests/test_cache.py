@@ -0,0 +1,29 @@
+"""缓存指纹的附属文件：同名的导出结果、性能报告与断点记录不能算作数据源的一部分"""
+
+import os
+import tempfile
+import unittest
+
+from export2xlsx.cache import _sidecar_files
+
+
+class SidecarFilesTest(unittest.TestCase):
+
+    def test_only_known_sidecars(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ('parcels.shp', 'parcels.dbf', 'parcels.SHX', 'parcels.prj', 'parcels.shp.xml',
+                         'parcels.xlsx', 'parcels.perf.json', 'parcels.xlsx.checkpoint.json', 'parcels.csv'):
+                open(os.path.join(tmp, name), 'w').close()
+            names = [os.path.basename(path) for path in _sidecar_files(os.path.join(tmp, 'parcels.shp'))]
+        self.assertEqual(names, ['parcels.SHX', 'parcels.dbf', 'parcels.prj', 'parcels.shp.xml'])
+
+    def test_sqlite_journals(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ('parcels.gpkg', 'parcels.gpkg-wal', 'parcels.gpkg-shm', 'parcels.xlsx'):
+                open(os.path.join(tmp, name), 'w').close()
+            names = [os.path.basename(path) for path in _sidecar_files(os.path.join(tmp, 'parcels.gpkg'))]
+        self.assertEqual(names, ['parcels.gpkg-shm', 'parcels.gpkg-wal'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""断点续传：分段导出中途取消后保留已完成的分段，再次导出从断点继续，拼接结果与原实现的单表输出相同"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import layers
+from export2xlsx.checkpoint import Checkpoint, manifest_path
+from export2xlsx.core import ExportCancelled, export_layer
+
+
+@unittest.skipUnless(layers.AVAILABLE, layers.SKIP_REASON)
+class CheckpointResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'parcels.gpkg')
+        layers.write_layer(self.source)
+        self.output = os.path.join(self.tmp.name, 'out.xlsx')
+        self.expected = layers.read_values(layers.legacy_export(layers.legacy_frame(self.source),
+                                                                os.path.join(self.tmp.name, 'legacy.xlsx')))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _export(self, **options):
+        return export_layer(self.source, self.output, checkpoint_rows=100, batch_size=50, chunk_size=25,
+                            **options)
+
+    def _export_cancelled_after(self, parts):
+        """导出到记录了 parts 个分段时置位取消，返回断点记录"""
+        cancel_event = threading.Event()
+        record_part = Checkpoint.record_part
+
+        def record_and_cancel(checkpoint, path, rows):
+            record_part(checkpoint, path, rows)
+            if len(checkpoint.parts) >= parts:
+                cancel_event.set()
+
+        with mock.patch.object(Checkpoint, 'record_part', record_and_cancel):
+            with self.assertRaises(ExportCancelled):
+                self._export(cancel_event=cancel_event)
+        with open(manifest_path(self.output), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_resume_after_cancel(self):
+        manifest = self._export_cancelled_after(2)
+        rows = [part['rows'] for part in manifest['parts']]
+        # 取消时正在写的分段正常关闭并记录
+        self.assertEqual(rows[:2], [100, 100])
+        self.assertLess(sum(rows), 500)
+        
+        messages = []
+        paths = self._export(status=messages.append)
+        self.assertIn(f"从第 {sum(rows) + 1} 行继续导出...", messages)
+        self.assertEqual([os.path.basename(path) for path in paths][:3], ['out.xlsx', 'out_2.xlsx', 'out_3.xlsx'])
+        self.assertEqual(layers.read_values(paths), self.expected)
+        self.assertFalse(os.path.exists(manifest_path(self.output)))
+
+    def test_modified_source_restarts(self):
+        self._export_cancelled_after(1)
+        stamp = os.stat(self.source).st_mtime_ns + 10 ** 9
+        os.utime(self.source, ns=(stamp, stamp))
+        messages = []
+        paths = self._export(status=messages.append)
+        self.assertFalse([message for message in messages if message.startswith("从第")])
+        self.assertEqual(len(paths), 5)
+        self.assertEqual(layers.read_values(paths), self.expected)
+
+    def test_cancel_without_checkpoint_removes_output(self):
+        cancel_event = threading.Event()
+        cancel_event.set()
+        with self.assertRaises(ExportCancelled):
+            export_layer(self.source, self.output, max_rows_per_file=100, batch_size=50, cancel_event=cancel_event)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['legacy.xlsx', 'parcels.gpkg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""单个图层导出流程：与原实现（整表读取、逐单元格写入）的输出一致，输出目录不存在时在读取数据前失败"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import layers
+from export2xlsx import core
+from export2xlsx.core import export_layer
+from export2xlsx.writer import EXCEL_MAX_ROWS, EXCEL_MAX_SHEET_NAME, XlsxStreamWriter
+
+# 各格式可用的读取引擎（dbf 只适用于 Shapefile）
+ENGINES = {
+    '.shp': ('auto', 'dbf', 'arrow', 'pyogrio', 'fiona'),
+    '.gpkg': ('auto', 'arrow', 'pyogrio', 'fiona'),
+    '.geojson': ('auto', 'arrow', 'pyogrio', 'fiona'),
+}
+
+
+class OutputDirTest(unittest.TestCase):
+
+    def test_missing_output_dir_fails_before_reading(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'missing', 'out.xlsx')
+            with mock.patch.object(core, '_open_batches') as open_batches, \
+                    mock.patch.object(core, '_layer_schema') as layer_schema:
+                with self.assertRaises(Exception) as caught:
+                    export_layer('layer.shp', output)
+            self.assertIn("输出目录不存在", str(caught.exception))
+            open_batches.assert_not_called()
+            layer_schema.assert_not_called()
+
+
+@unittest.skipUnless(layers.AVAILABLE, layers.SKIP_REASON)
+class StreamingExportTest(unittest.TestCase):
+    """按批读取、写完即释放的流式导出，结果与原实现整表读入后逐单元格写入的输出相同"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _source(self, ext):
+        source = os.path.join(self.tmp.name, 'parcels' + ext)
+        layers.write_layer(source, encoding='GBK' if ext == '.shp' else None)
+        return source
+
+    def test_matches_legacy_export(self):
+        for ext, engines in ENGINES.items():
+            source = self._source(ext)
+            expected = layers.read_values(layers.legacy_export(layers.legacy_frame(source),
+                                                               os.path.join(self.tmp.name, f'legacy{ext}.xlsx')))
+            self.assertEqual(len(expected), 501)
+            for engine in engines:
+                with self.subTest(format=ext, engine=engine):
+                    output = os.path.join(self.tmp.name, f'stream_{engine}{ext}.xlsx')
+                    paths = export_layer(source, output, engine=engine, batch_size=70, chunk_size=30)
+                    self.assertEqual(paths, [output])
+                    self.assertEqual(layers.read_values(paths), expected)
+
+    def test_selected_fields_keep_their_order(self):
+        source = self._source('.gpkg')
+        fields = ['面积', '名称', '编号']
+        expected = layers.read_values(layers.legacy_export(layers.legacy_frame(source, fields),
+                                                           os.path.join(self.tmp.name, 'legacy.xlsx')))
+        paths = export_layer(source, os.path.join(self.tmp.name, 'out.xlsx'), fields=fields + ['不存在的字段'],
+                             batch_size=64)
+        self.assertEqual(layers.read_values(paths), expected)
+
+
+@unittest.skipUnless(layers.AVAILABLE, layers.SKIP_REASON)
+class SplitExportTest(unittest.TestCase):
+    """超过单表行数或单文件预算时续写到新的工作表、工作簿，拼接后与原实现的单表输出相同"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'parcels.gpkg')
+        layers.write_layer(self.source)
+        self.expected = layers.read_values(layers.legacy_export(layers.legacy_frame(self.source),
+                                                                os.path.join(self.tmp.name, 'legacy.xlsx')))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_split_files_by_rows(self):
+        output = os.path.join(self.tmp.name, 'out.xlsx')
+        paths = export_layer(self.source, output, max_rows_per_file=200, batch_size=70)
+        self.assertEqual(paths, [output, os.path.join(self.tmp.name, 'out_2.xlsx'),
+                                 os.path.join(self.tmp.name, 'out_3.xlsx')])
+        self.assertEqual([len(layers.read_values([path])) - 1 for path in paths], [200, 200, 100])
+        for path in paths:
+            self.assertEqual(layers.read_values([path])[0], self.expected[0])
+        self.assertEqual(layers.read_values(paths), self.expected)
+
+    def test_split_files_by_bytes(self):
+        paths = export_layer(self.source, os.path.join(self.tmp.name, 'out.xlsx'), max_bytes_per_file=20000,
+                             batch_size=50, chunk_size=50)
+        self.assertGreater(len(paths), 1)
+        self.assertEqual(layers.read_values(paths), self.expected)
+
+    def test_split_sheets_repeat_header(self):
+        df = layers.legacy_frame(self.source)
+        output = os.path.join(self.tmp.name, 'sheets.xlsx')
+        writer = XlsxStreamWriter(output, 'Sheet1', list(df.columns), max_rows_per_sheet=150)
+        for start in range(0, len(df), 70):
+            writer.write_batch(df.iloc[start:start + 70])
+        self.assertEqual(writer.close(), [output])
+        self.assertEqual(layers.sheet_names(output), ['Sheet1', 'Sheet1_2', 'Sheet1_3', 'Sheet1_4'])
+        self.assertEqual(layers.read_values([output]), self.expected)
+
+    def test_sheet_limits(self):
+        output = os.path.join(self.tmp.name, 'limits.xlsx')
+        writer = XlsxStreamWriter(output, 'S' * 40, ['编号'], max_rows_per_sheet=EXCEL_MAX_ROWS * 2)
+        self.assertEqual(writer.max_rows_per_sheet, EXCEL_MAX_ROWS - 1)
+        writer.close()
+        self.assertEqual(layers.sheet_names(output), ['S' * EXCEL_MAX_SHEET_NAME])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""内存映射 DBF 读取器：与 pyogrio（按正确编码读取）逐值比较"""
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+import layers
+from export2xlsx.dbf import iter_dbf_batches, read_dbf_header
+from export2xlsx.reader import _has_module
+
+NAMES = ["城关区", "七里河区", "西固区", None, "安宁区ABC", "榆中县"]
+
+
+def _write_shapefile(path, encoding, rows=600):
+    """写入点 Shapefile（英文字段名、中文属性值），返回写入的属性 {字段: 值列表}"""
+    import pyarrow as pa
+    import pyogrio
+    import shapely
+
+    data = {
+        'CODE': list(range(rows)),
+        'NAME': [NAMES[i % len(NAMES)] for i in range(rows)],
+        'AREA': [i * 1.5 for i in range(rows)],
+    }
+    table = pa.table({**data, 'geometry': shapely.to_wkb(shapely.points(range(rows), range(rows)))})
+    pyogrio.write_arrow(table, path, geometry_name='geometry', geometry_type='Point', crs='EPSG:4326',
+                        driver='ESRI Shapefile', encoding=encoding)
+    return data
+
+
+def _strip_encoding_info(shp_path):
+    """删除 .cpg 并把语言驱动 ID 置零，只能靠猜测确定编码"""
+    root = os.path.splitext(shp_path)[0]
+    if os.path.exists(root + '.cpg'):
+        os.remove(root + '.cpg')
+    with open(root + '.dbf', 'r+b') as f:
+        f.seek(29)
+        f.write(b'\x00')
+    return root + '.dbf'
+
+
+def _values(series):
+    """列中的值（缺失值统一为 None）"""
+    return [None if pd.isna(value) else value for value in series]
+
+
+def _read_all(dbf_path, **options):
+    return pd.concat(list(iter_dbf_batches(dbf_path, batch_size=250, **options)), ignore_index=True)
+
+
+@unittest.skipUnless(_has_module('pyogrio') and _has_module('shapely'), "需要 pyogrio 与 shapely")
+class DbfEncodingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_gbk_without_cpg(self):
+        import pyogrio
+
+        shp = os.path.join(self.tmp.name, 'gbk.shp')
+        expected = _write_shapefile(shp, 'GBK')
+        dbf = _strip_encoding_info(shp)
+        self.assertEqual(read_dbf_header(dbf).encoding, 'gbk')
+        df = _read_all(dbf)
+        self.assertEqual(_values(df['NAME']), expected['NAME'])
+        reference = pyogrio.read_dataframe(shp, read_geometry=False, encoding='gbk')
+        self.assertEqual(_values(df['NAME']), _values(reference['NAME']))
+
+    def test_utf8_without_cpg(self):
+        shp = os.path.join(self.tmp.name, 'utf8.shp')
+        expected = _write_shapefile(shp, 'UTF-8')
+        dbf = _strip_encoding_info(shp)
+        self.assertEqual(read_dbf_header(dbf).encoding, 'utf-8')
+        df = _read_all(dbf)
+        self.assertEqual(_values(df['NAME']), expected['NAME'])
+
+
+@unittest.skipUnless(_has_module('pyogrio') and _has_module('shapely'), "需要 pyogrio 与 shapely")
+class DbfDateTest(unittest.TestCase):
+
+    def test_garbage_date_bytes_become_missing(self):
+        import datetime
+
+        import pyarrow as pa
+        import pyogrio
+        import shapely
+
+        with tempfile.TemporaryDirectory() as tmp:
+            shp = os.path.join(tmp, 'dates.shp')
+            dates = [datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(5)]
+            table = pa.table({'DAY': pa.array(dates, pa.date32()),
+                              'geometry': shapely.to_wkb(shapely.points(range(5), range(5)))})
+            pyogrio.write_arrow(table, shp, geometry_name='geometry', geometry_type='Point', crs='EPSG:4326',
+                                driver='ESRI Shapefile')
+            dbf = os.path.splitext(shp)[0] + '.dbf'
+            header = read_dbf_header(dbf)
+            field = header.fields[0]
+            # 第 2 条记录的日期写入 GBK 汉字与损坏的字节
+            with open(dbf, 'r+b') as f:
+                f.seek(header.header_length + header.record_length + field.offset)
+                f.write('日期'.encode('gbk') + b'\xff\xfe01')
+            df = _read_all(dbf)
+        self.assertEqual(len(df), 5)
+        self.assertTrue(pd.isna(df['DAY'][1]))
+        self.assertEqual([pd.Timestamp(value).date() for i, value in enumerate(df['DAY']) if i != 1],
+                         [value for i, value in enumerate(dates) if i != 1])
+
+
+@unittest.skipUnless(layers.AVAILABLE, layers.SKIP_REASON)
+class DbfReaderTest(unittest.TestCase):
+    """分批读取、选列、断点起点与已删除记录：与原实现 gpd.read_file 整表读入的值一致"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.shp = os.path.join(self.tmp.name, 'parcels.shp')
+        layers.write_layer(self.shp, encoding='GBK')
+        self.dbf = self.shp[:-4] + '.dbf'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertFrameValues(self, df, expected):
+        self.assertEqual(list(df.columns), list(expected.columns))
+        for name in expected.columns:
+            self.assertEqual(_values(df[name]), _values(expected[name]), name)
+
+    def _delete_records(self, *indexes):
+        header = read_dbf_header(self.dbf)
+        with open(self.dbf, 'r+b') as f:
+            for index in indexes:
+                f.seek(header.header_length + index * header.record_length)
+                f.write(b'*')
+
+    def test_all_fields_in_batches(self):
+        expected = layers.legacy_frame(self.shp)
+        batches = list(iter_dbf_batches(self.dbf, batch_size=70))
+        self.assertEqual([len(batch) for batch in batches], [70] * 7 + [10])
+        self.assertFrameValues(pd.concat(batches, ignore_index=True), expected)
+
+    def test_selected_columns(self):
+        columns = ['行政区', '编号', '不存在的字段', '登记日期']
+        expected = layers.legacy_frame(self.shp, ['行政区', '编号', '登记日期'])
+        self.assertFrameValues(_read_all(self.dbf, columns=columns), expected)
+
+    def test_deleted_records_and_start(self):
+        self._delete_records(3, 200, 201, 499)
+        expected = layers.legacy_frame(self.shp)
+        self.assertEqual(len(expected), 496)
+        for start in (0, 3, 150, 495, 496, 600):
+            with self.subTest(start=start):
+                df = _read_all(self.dbf, start=start)
+                self.assertFrameValues(df, expected.iloc[start:].reset_index(drop=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
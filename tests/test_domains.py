@@ -0,0 +1,134 @@
+"""值域与别名：整列查表解码与逐个单元格查字典的结果相同；GeoPackage 的别名与枚举值域在导出中生效"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import pandas as pd
+
+import layers
+from export2xlsx.core import export_layer
+from export2xlsx.domains import DomainLookup, build_lookups, decode_domains
+from export2xlsx.schema import FieldInfo
+
+# GeoPackage 的枚举值总是文本；Shapefile/FileGDB 的编码可能是数值
+TEXT_CODES = {'1': "耕地", '2': "林地", '3': "草地"}
+NUMERIC_CODES = {1: "耕地", 2: "林地", 3: "草地"}
+DISTRICT_CODES = {"城关区": "城关区（620102）", "七里河区": "七里河区（620103）", "西固区": "西固区（620104）"}
+
+
+def reference_decode(values, domain):
+    """逐个单元格查字典：数值按数值匹配编码，其余按文本匹配；未匹配的值与空值保持原样"""
+    numeric = {}
+    for code, description in domain.items():
+        try:
+            numeric.setdefault(float(code), description)
+        except ValueError:
+            pass
+    text = {str(code): description for code, description in domain.items()}
+    result = []
+    for value in values:
+        if pd.isna(value):
+            result.append(None)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            result.append(numeric.get(float(value), value))
+        else:
+            result.append(text.get(str(value), value))
+    return result
+
+
+def _values(values):
+    return [None if pd.isna(value) else value for value in values]
+
+
+class DomainLookupTest(unittest.TestCase):
+
+    def assertDecoded(self, series, domain):
+        decoded = DomainLookup(domain).decode(series)
+        self.assertEqual(len(decoded), len(series))
+        self.assertEqual(_values(decoded), reference_decode(series.tolist(), domain))
+        return decoded
+
+    def test_numeric_columns(self):
+        for domain in (TEXT_CODES, NUMERIC_CODES):
+            with self.subTest(codes=type(next(iter(domain))).__name__):
+                # 低基数整数列、含空值的浮点列、高基数整数列（含未匹配的编码）
+                self.assertDecoded(pd.Series([1, 2, 3, 4, 1, 2] * 50), domain)
+                self.assertDecoded(pd.Series([1.0, None, 3.0, 2.5] * 50), domain)
+                self.assertDecoded(pd.Series(range(300)), domain)
+
+    def test_text_columns(self):
+        values = ["城关区", "七里河区", None, "安宁区", "西固区"] * 60
+        decoded = self.assertDecoded(pd.Series(values, dtype=object), DISTRICT_CODES)
+        self.assertIsInstance(decoded.dtype, pd.CategoricalDtype)
+        self.assertDecoded(pd.Series(values, dtype='str'), DISTRICT_CODES)
+        self.assertDecoded(pd.Series(values, dtype='category'), DISTRICT_CODES)
+        self.assertDecoded(pd.Series([f"{i}" for i in range(300)], dtype=object), TEXT_CODES)
+
+    def test_decode_domains_keeps_other_columns(self):
+        df = pd.DataFrame({'地类': [1, 2, 9], '名称': ["甲", "乙", "丙"]}, index=[5, 6, 7])
+        lookups = build_lookups([FieldInfo('地类', 'int64', None, TEXT_CODES), FieldInfo('名称', 'object', None),
+                                 FieldInfo('不存在的字段', 'int64', None, TEXT_CODES)])
+        self.assertEqual(list(lookups), ['地类', '不存在的字段'])
+        decoded = decode_domains(df, lookups)
+        self.assertEqual(list(decoded.index), [5, 6, 7])
+        self.assertEqual(decoded['地类'].tolist(), ["耕地", "林地", 9])
+        self.assertEqual(decoded['名称'].tolist(), ["甲", "乙", "丙"])
+        self.assertEqual(df['地类'].tolist(), [1, 2, 9])
+
+
+def add_gpkg_metadata(path, table, aliases, domains):
+    """在 GeoPackage 中登记字段别名（gpkg_data_columns.name）与枚举值域（gpkg_data_column_constraints）"""
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS gpkg_data_columns (table_name TEXT NOT NULL, "
+                     "column_name TEXT NOT NULL, name TEXT, title TEXT, description TEXT, mime_type TEXT, "
+                     "constraint_name TEXT, PRIMARY KEY (table_name, column_name))")
+        conn.execute("CREATE TABLE IF NOT EXISTS gpkg_data_column_constraints (constraint_name TEXT NOT NULL, "
+                     "constraint_type TEXT NOT NULL, value TEXT, min NUMERIC, min_is_inclusive BOOLEAN, "
+                     "max NUMERIC, max_is_inclusive BOOLEAN, description TEXT)")
+        for column in set(aliases) | set(domains):
+            constraint = f"{column}_domain" if column in domains else None
+            conn.execute("INSERT INTO gpkg_data_columns (table_name, column_name, name, constraint_name) "
+                         "VALUES (?, ?, ?, ?)", (table, column, aliases.get(column), constraint))
+            for value, description in domains.get(column, {}).items():
+                conn.execute("INSERT INTO gpkg_data_column_constraints (constraint_name, constraint_type, value, "
+                             "description) VALUES (?, 'enum', ?, ?)", (constraint, value, description))
+
+
+@unittest.skipUnless(layers.AVAILABLE, layers.SKIP_REASON)
+class AliasDomainExportTest(unittest.TestCase):
+    """use_alias/use_domain 导出与“原实现读取 + 逐单元格查字典 + 改列名”的结果相同"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'parcels.gpkg')
+        layers.write_layer(self.source)
+        self.aliases = {'面积': "面积（平方米）", '名称': "地块名称"}
+        self.domains = {'编号': TEXT_CODES, '行政区': DISTRICT_CODES}
+        add_gpkg_metadata(self.source, 'parcels', self.aliases, self.domains)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_export_with_alias_and_domain(self):
+        df = layers.legacy_frame(self.source)
+        for column, domain in self.domains.items():
+            df[column] = pd.Series(reference_decode(df[column].tolist(), domain), dtype=object)
+        df = df.rename(columns=self.aliases)
+        expected = layers.read_values(layers.legacy_export(df, os.path.join(self.tmp.name, 'legacy.xlsx')))
+        for engine in ('arrow', 'pyogrio'):
+            with self.subTest(engine=engine):
+                paths = export_layer(self.source, os.path.join(self.tmp.name, f'{engine}.xlsx'), engine=engine,
+                                     use_alias=True, use_domain=True, batch_size=70, chunk_size=30)
+                self.assertEqual(layers.read_values(paths), expected)
+
+    def test_options_off_export_codes(self):
+        expected = layers.read_values(layers.legacy_export(layers.legacy_frame(self.source),
+                                                           os.path.join(self.tmp.name, 'legacy.xlsx')))
+        paths = export_layer(self.source, os.path.join(self.tmp.name, 'out.xlsx'))
+        self.assertEqual(layers.read_values(paths), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+"""WKT 列：超过 Excel 单元格上限的 WKT 替换为提示文本并计数，不交给 XlsxWriter 静默丢弃"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from export2xlsx.geometry import EXCEL_MAX_STRING, add_geometry_columns
+
+
+class WktLimitTest(unittest.TestCase):
+
+    def setUp(self):
+        angles = np.linspace(0, 2 * np.pi, 3000)
+        big = shapely.Polygon(np.c_[120 + np.cos(angles), 30 + np.sin(angles)])
+        self.df = pd.DataFrame({'name': ['big', 'small', 'empty'],
+                                'geometry': shapely.to_wkb([big, shapely.Point(120, 30), None])})
+
+    def test_too_long_wkt_is_replaced(self):
+        df, too_long = add_geometry_columns(self.df, ['wkt'], max_wkt_length=EXCEL_MAX_STRING)
+        self.assertEqual(too_long, 1)
+        self.assertTrue(df['WKT'][0].startswith('#WKT过长'))
+        self.assertEqual(df['WKT'][1], 'POINT (120 30)')
+        self.assertTrue(pd.isna(df['WKT'][2]))
+        self.assertTrue((df['WKT'].dropna().str.len() <= EXCEL_MAX_STRING).all())
+
+    def test_full_wkt_without_limit(self):
+        df, too_long = add_geometry_columns(self.df, ['wkt'])
+        self.assertEqual(too_long, 0)
+        self.assertGreater(len(df['WKT'][0]), EXCEL_MAX_STRING)
+
+
+if __name__ == '__main__':
+    unittest.main()
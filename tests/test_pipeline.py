@@ -0,0 +1,115 @@
+"""预读流水线与取消：读取线程读到一半时取消，导出必须以 ExportCancelled 结束"""
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from export2xlsx import core
+from export2xlsx.checkpoint import manifest_path
+from export2xlsx.core import ExportCancelled, export_layer
+from export2xlsx.pipeline import Prefetcher
+from export2xlsx.reader import _has_module
+
+
+def _frame(start, rows):
+    return pd.DataFrame({'编号': range(start, start + rows), '名称': ['甲'] * rows})
+
+
+class CancelDuringPrefetchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, 'out.xlsx')
+        self.cancel_event = threading.Event()
+        self.written = threading.Event()
+        self.checks = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _batches(self):
+        """预读的批次都已写完、读取线程正在读下一批时被取消（队列中不再有数据）"""
+        yield _frame(500, 500)
+        self.written.wait(5)
+        self.cancel_event.set()
+        yield _frame(1000, 500)
+        yield _frame(1500, 500)
+
+    def _batch_written(self):
+        # 每写完一批调用一次 MemoryGuard.check；第二批（预读的第一批）写完后才取消
+        self.checks += 1
+        if self.checks == 2:
+            self.written.set()
+
+    def _export(self, **options):
+        batches = self._batches()
+        guard = mock.Mock()
+        guard.check.side_effect = self._batch_written
+        with mock.patch.object(core, '_layer_schema', return_value=None), \
+                mock.patch.object(core, 'MemoryGuard', return_value=guard), \
+                mock.patch.object(core, '_feature_count', return_value=3000), \
+                mock.patch('export2xlsx.reader._open_batches', return_value=(_frame(0, 500), batches)):
+            return export_layer('layer.shp', self.output, pipeline=True, batch_size=500,
+                                cancel_event=self.cancel_event, **options)
+
+    def test_prefetcher_stops_when_cancelled(self):
+        prefetched = Prefetcher(self._batches, cancel_event=self.cancel_event)
+        try:
+            self.assertEqual(len(next(prefetched)), 500)
+            self.written.set()
+            self.assertIsNone(next(prefetched, None))
+            self.assertTrue(self.cancel_event.is_set())
+        finally:
+            prefetched.close()
+
+    def test_cancel_raises_and_removes_output(self):
+        with self.assertRaises(ExportCancelled):
+            self._export()
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_cancel_keeps_checkpoint_and_skips_cache(self):
+        cache = mock.Mock()
+        cache.restore.return_value = None
+        with mock.patch.object(core, 'fingerprint', return_value='key'), \
+                mock.patch('export2xlsx.checkpoint._source_signature', return_value={}):
+            with self.assertRaises(ExportCancelled):
+                self._export(checkpoint_rows=500, cache=cache)
+        self.assertTrue(os.path.exists(manifest_path(self.output)))
+        cache.store.assert_not_called()
+
+
+@unittest.skipUnless(_has_module('fiona') and _has_module('pyogrio') and _has_module('openpyxl'), "需要 fiona、pyogrio 与 openpyxl")
+class FionaPipelineTest(unittest.TestCase):
+    """fiona 的 GDAL 环境按线程保存：数据源必须在读取线程中打开和关闭"""
+
+    def test_fiona_with_pipeline(self):
+        import openpyxl
+        import pyarrow as pa
+        import pyogrio
+        import shapely
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'points.gpkg')
+            rows = 2500
+            table = pa.table({'编号': list(range(rows)), '名称': [f"地块{i}号" for i in range(rows)],
+                              'geometry': shapely.to_wkb(shapely.points(range(rows), range(rows)))})
+            pyogrio.write_arrow(table, source, layer='points', geometry_name='geometry', geometry_type='Point',
+                                crs='EPSG:4326', driver='GPKG')
+            sheets = []
+            for name, pipeline in (('serial.xlsx', False), ('pipeline.xlsx', True)):
+                output = os.path.join(tmp, name)
+                paths = export_layer(source, output, engine='fiona', pipeline=pipeline, batch_size=1000)
+                self.assertEqual(paths, [output])
+                workbook = openpyxl.load_workbook(output, read_only=True)
+                sheets.append([row for row in workbook.active.iter_rows(values_only=True)])
+                workbook.close()
+        self.assertEqual(len(sheets[1]), rows + 1)
+        self.assertEqual(sheets[0], sheets[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
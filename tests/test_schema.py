@@ -0,0 +1,70 @@
+"""图层结构探测：各种探测方式得到的字段与要素数与原实现 gpd.read_file 读入的表一致，缓存随文件修改失效"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import layers
+from export2xlsx import schema
+from export2xlsx.reader import _has_module
+from export2xlsx.schema import read_schema
+
+
+@unittest.skipUnless(layers.AVAILABLE, layers.SKIP_REASON)
+class ReadSchemaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        schema._read_schema_cached.cache_clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _layer(self, name, rows=120):
+        path = os.path.join(self.tmp.name, name)
+        layers.write_layer(path, rows=rows, encoding='GBK' if name.endswith('.shp') else None)
+        return path
+
+    def test_fields_match_legacy_frame(self):
+        for name in ('parcels.shp', 'parcels.gpkg', 'parcels.geojson'):
+            with self.subTest(source=name):
+                path = self._layer(name)
+                legacy = layers.legacy_frame(path)
+                result = read_schema(path)
+                self.assertEqual([field.name for field in result.fields], list(legacy.columns))
+                self.assertEqual(result.feature_count, len(legacy))
+                self.assertEqual(result.layer, 'parcels')
+
+    def test_probes_agree(self):
+        path = self._layer('parcels.shp')
+        legacy = layers.legacy_frame(path)
+        probes = [schema._probe_dbf, schema._probe_pyogrio]
+        if _has_module('fiona'):
+            probes.append(schema._probe_fiona)
+        for probe in probes:
+            with self.subTest(probe=probe.__name__):
+                result = probe(path, None)
+                self.assertEqual([field.name for field in result.fields], list(legacy.columns))
+                self.assertIn(result.feature_count, (len(legacy), None))
+        # DBF 文件头推断的类型与 pyogrio 一致（日期只比较类别，精度不同）
+        kinds = [[np.dtype(field.dtype).kind for field in probe(path, None).fields]
+                 for probe in (schema._probe_dbf, schema._probe_pyogrio)]
+        self.assertEqual(kinds[0], kinds[1])
+
+    def test_cache_invalidated_by_modification(self):
+        path = self._layer('parcels.shp')
+        first = read_schema(path)
+        self.assertIs(read_schema(path), first)
+        self._layer('parcels.shp', rows=80)
+        stamp = os.stat(path).st_mtime_ns + 10 ** 9
+        os.utime(path[:-4] + '.dbf', ns=(stamp, stamp))
+        second = read_schema(path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.feature_count, 80)
+        self.assertEqual(first.feature_count, 120)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,233 @@
+"""XLSX 写入：共享字符串工作表依赖 XlsxWriter 的内部接口，读回输出逐个单元格核对"""
+
+import datetime
+import os
+import re
+import tempfile
+import unicodedata
+import unittest
+import zipfile
+from unittest import mock
+
+import pandas as pd
+
+import layers
+from export2xlsx import writer
+from export2xlsx.core import export_layer
+from export2xlsx.writer import MAX_COLUMN_WIDTH, MIN_COLUMN_WIDTH, XlsxStreamWriter
+
+DISTRICTS = ["城关区", "七里河区", "西固区", "安宁区"]
+LAND_USES = ["耕地", "林地", "草地"]
+
+
+def make_frame(rows=400):
+    """低基数文本（object 与分类）、高基数文本、数值、日期与空值混合的测试数据"""
+    return pd.DataFrame({
+        '编号': range(rows),
+        '行政区': pd.Series([DISTRICTS[i % 4] if i % 7 else None for i in range(rows)], dtype=object),
+        '地类': pd.Categorical([LAND_USES[i % 3] if i % 5 else None for i in range(rows)]),
+        '名称': pd.Series([f"地块{i}号" for i in range(rows)], dtype=object),
+        '面积': [i * 1.5 if i % 9 else None for i in range(rows)],
+        '日期': pd.to_datetime([datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(rows)]),
+    })
+
+
+def expected_rows(df):
+    """df 写入后应读回的各行（含表头），空值为 None"""
+    rows = [tuple(df.columns)]
+    for record in df.astype(object).itertuples(index=False):
+        rows.append(tuple(None if pd.isna(value) else value.to_pydatetime() if isinstance(value, pd.Timestamp)
+                          else value for value in record))
+    return rows
+
+
+def read_rows(path):
+    """用 openpyxl 读回全部工作表的行（按工作表顺序拼接，不含续表的表头）"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    rows = []
+    for index, worksheet in enumerate(workbook.worksheets):
+        sheet_rows = list(worksheet.iter_rows(values_only=True))
+        rows.extend(sheet_rows if index == 0 else sheet_rows[1:])
+    workbook.close()
+    return rows
+
+
+def shared_string_stats(path):
+    """返回 (sst 的 count, sst 的 uniqueCount, <si> 个数, 工作表中共享字符串单元格数)"""
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        sheets = ''.join(archive.read(name).decode('utf-8') for name in names
+                         if name.startswith('xl/worksheets/sheet'))
+        cells = len(re.findall(r'<c [^>]*t="s"', sheets))
+        if 'xl/sharedStrings.xml' not in names:
+            return 0, 0, 0, cells
+        sst = archive.read('xl/sharedStrings.xml').decode('utf-8')
+    count = int(re.search(r'<sst [^>]*count="(\d+)"', sst).group(1))
+    unique = int(re.search(r'<sst [^>]*uniqueCount="(\d+)"', sst).group(1))
+    return count, unique, sst.count('<si>'), cells
+
+
+def write_frame(df, path, batch_rows=150, **options):
+    stream = XlsxStreamWriter(path, 'Sheet1', list(df.columns), **options)
+    for start in range(0, len(df), batch_rows):
+        stream.write_batch(df.iloc[start:start + batch_rows])
+    return stream.close()
+
+
+class SharedStringWorksheetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'out.xlsx')
+        self.df = make_frame()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        write_frame(self.df, self.path)
+        self.assertEqual(read_rows(self.path), expected_rows(self.df))
+        count, unique, items, cells = shared_string_stats(self.path)
+        # 低基数的行政区与地类经共享字符串表写入，每个不重复值只保存一次
+        self.assertEqual(count, int(self.df['行政区'].notna().sum() + self.df['地类'].notna().sum()))
+        self.assertEqual(count, cells)
+        self.assertEqual(unique, len(DISTRICTS) + len(LAND_USES))
+        self.assertEqual(unique, items)
+
+    def test_unique_string_limit_falls_back_to_inline(self):
+        limit = len(DISTRICTS) + 1
+        with mock.patch.object(writer, 'SHARED_STRING_LIMIT', limit):
+            write_frame(self.df, self.path)
+        self.assertEqual(read_rows(self.path), expected_rows(self.df))
+        count, unique, items, cells = shared_string_stats(self.path)
+        self.assertLessEqual(unique, limit)
+        self.assertEqual(unique, items)
+        self.assertEqual(count, cells)
+        self.assertGreater(count, 0)
+
+    def test_sheet_and_file_splits(self):
+        paths = write_frame(self.df, self.path, max_rows_per_sheet=120, max_rows_per_file=250)
+        self.assertEqual(len(paths), 2)
+        rows = [row for path in paths for row in read_rows(path)[1:]]
+        self.assertEqual(rows, expected_rows(self.df)[1:])
+        for path in paths:
+            count, unique, items, cells = shared_string_stats(path)
+            self.assertEqual(count, cells)
+            self.assertEqual(unique, items)
+
+
+@unittest.skipUnless(layers.AVAILABLE, layers.SKIP_REASON)
+class ColumnarWriterTest(unittest.TestCase):
+    """按列转换、成批写入的结果与原实现 iterrows 逐单元格 worksheet.write 的输出逐个单元格相同"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_cells(self, path):
+        """[(坐标, 值, 值类型, 左边框, 粗体)]，值按 layers._normalize 统一（True == 1，因此另比较类型）"""
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(path)
+        cells = [(cell.coordinate, layers._normalize(cell.value), type(layers._normalize(cell.value)).__name__,
+                  cell.border.left.style, cell.font.b)
+                 for row in workbook.worksheets[0].iter_rows() for cell in row]
+        workbook.close()
+        return cells
+
+    def test_same_cells_as_legacy_writer(self):
+        rows = 300
+        df = pd.DataFrame({
+            '编号': range(rows),
+            '面积': [i * 0.1 if i % 9 else None for i in range(rows)],
+            '名称': pd.Series([f"地块{i}号" if i % 11 else None for i in range(rows)], dtype=object),
+            '行政区': pd.Categorical([DISTRICTS[i % 4] for i in range(rows)]),
+            # 像公式、网址和数字的文本按文本原样写入
+            '备注': pd.Series([["=1+1", "http://example.com", "00123", " 前后空格 ", ""][i % 5] for i in range(rows)],
+                            dtype=object),
+            '已核查': [bool(i % 2) for i in range(rows)],
+            '混合': pd.Series([[1, "甲", 2.5, None, True][i % 5] for i in range(rows)], dtype=object),
+            '日期': pd.to_datetime([datetime.date(2000, 1, 1) + datetime.timedelta(days=i) if i % 13 else None
+                                  for i in range(rows)]),
+        })
+        legacy = layers.legacy_export(df, os.path.join(self.tmp.name, 'legacy.xlsx'))[0]
+        columnar = write_frame(df, os.path.join(self.tmp.name, 'columnar.xlsx'), batch_rows=70)[0]
+        expected = self.read_cells(legacy)
+        self.assertEqual(len(expected), (rows + 1) * len(df.columns))
+        self.assertEqual(self.read_cells(columnar), expected)
+
+
+def display_width(value):
+    """逐个字符按 Unicode 东亚宽度计算的显示宽度（全角、宽字符计 2）"""
+    if isinstance(value, float):
+        value = f"{value:.10g}"
+    return sum(2 if unicodedata.east_asian_width(char) in 'WF' else 1 for char in str(value))
+
+
+def column_widths(path):
+    """读回各工作表的列宽 {工作表名: [宽度]}"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path)
+    widths = {worksheet.title: [dimension.width for dimension in worksheet.column_dimensions.values()]
+              for worksheet in workbook.worksheets}
+    workbook.close()
+    return widths
+
+
+class ColumnWidthsTest(unittest.TestCase):
+    """列宽：按抽样数据估算，全角字符计 2，限制在上下限之间"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertWidths(self, actual, expected):
+        # XlsxWriter 按像素取整后写入，读回的宽度比设置值多不到 1
+        self.assertEqual(len(actual), len(expected))
+        for got, width in zip(actual, expected):
+            self.assertGreaterEqual(got, width)
+            self.assertLess(got, width + 1)
+
+    def test_text_width(self):
+        for text in ("", "abc", "城关区", "地块12号", "ＡＢ全角", "七里河区 No.3"):
+            with self.subTest(text=text):
+                self.assertEqual(writer._text_width(text), display_width(text))
+
+    def test_clamped(self):
+        df = pd.DataFrame({'a': ["x"] * 10, 'b': ["很长的文本" * 20] * 10})
+        paths = write_frame(df, os.path.join(self.tmp.name, 'out.xlsx'))
+        self.assertWidths(column_widths(paths[0])['Sheet1'], [MIN_COLUMN_WIDTH, MAX_COLUMN_WIDTH])
+
+    @unittest.skipUnless(layers.AVAILABLE, layers.SKIP_REASON)
+    def test_widths_fit_all_values(self):
+        source = os.path.join(self.tmp.name, 'parcels.gpkg')
+        layers.write_layer(source)
+        df = layers.legacy_frame(source)
+        expected = []
+        for name in df.columns:
+            if name == '登记日期':
+                # 日期按 yyyy-mm-dd 显示
+                width = max(display_width(name), 10)
+            else:
+                width = max([display_width(name)] + [display_width(value) for value in df[name].dropna()])
+            expected.append(min(max(width + 2, MIN_COLUMN_WIDTH), MAX_COLUMN_WIDTH))
+        # 原实现只按字段名设置列宽（len * 1.5），数据列经常过窄
+        legacy = [min(len(name) * 1.5, 50) for name in df.columns]
+        self.assertTrue(all(width >= old for width, old in zip(expected, legacy)))
+        
+        paths = export_layer(source, os.path.join(self.tmp.name, 'out.xlsx'), max_rows_per_file=300)
+        self.assertEqual(len(paths), 2)
+        for path in paths:
+            for widths in column_widths(path).values():
+                self.assertWidths(widths, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()